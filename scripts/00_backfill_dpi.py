@@ -9,14 +9,20 @@ Usage:
     python scripts/00_backfill_dpi.py
     python scripts/00_backfill_dpi.py --collection-slug islamic-cartography
     python scripts/00_backfill_dpi.py --dry-run
+    python scripts/00_backfill_dpi.py --workers 4
 """
 
 import argparse
+import functools
 import json
+import os
 import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
+from statistics import median_high
 
 _ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(_ROOT / "src"))
 
 try:
     import pypdfium2 as pdfium
@@ -25,10 +31,16 @@ except ImportError:
     print("ERROR: pypdfium2 not installed.  Run: pip install pypdfium2")
     sys.exit(1)
 
+from json_io import write_json_list
+
 
 COLLECTIONS_PATH = _ROOT / "data" / "collections.json"
 
+# Object-type filter for page.get_objects (pypdfium2 only does membership tests)
+_IMG_FILTER = (FPDF_PAGEOBJ_IMAGE,)
+
 
+@functools.lru_cache(maxsize=None)
 def _get_collection_base(slug: str) -> Path:
     if not COLLECTIONS_PATH.exists():
         raise SystemExit("ERROR: data/collections.json not found")
@@ -43,46 +55,66 @@ def _get_collection_base(slug: str) -> Path:
     raise SystemExit(f"ERROR: collection slug {slug!r} not found")
 
 
-def _estimate_page_dpi(page) -> float | None:
-    """Estimate effective DPI of images on a single PDF page."""
+def _estimate_page_dpi(page, max_samples: int = 8) -> float | None:
+    """Estimate effective DPI of images on a single PDF page.
+
+    Stops after ``max_samples`` measurements — the median settles quickly and
+    each image costs two pdfium FFI calls on image-dense atlas pages.
+    """
     dpis = []
     try:
-        for obj in page.get_objects(filter=[FPDF_PAGEOBJ_IMAGE]):
+        for obj in page.get_objects(filter=_IMG_FILTER):
+            if len(dpis) >= max_samples:
+                break
             try:
                 px_w, px_h = obj.get_size()
                 left, bottom, right, top = obj.get_bounds()
                 box_w_pts = abs(right - left)
                 box_h_pts = abs(top - bottom)
                 if box_w_pts > 0 and px_w > 0:
-                    dpis.append(px_w / (box_w_pts / 72.0))
+                    dpis.append(px_w * 72.0 / box_w_pts)
                 if box_h_pts > 0 and px_h > 0:
-                    dpis.append(px_h / (box_h_pts / 72.0))
+                    dpis.append(px_h * 72.0 / box_h_pts)
             except Exception:
                 continue
     except Exception:
         return None
     if not dpis:
         return None
-    dpis.sort()
-    return dpis[len(dpis) // 2]
+    return median_high(dpis)
 
 
 def estimate_pdf_dpi(pdf_path: Path) -> int | None:
-    """Open a PDF and estimate DPI from first 3 pages."""
+    """Open a PDF and estimate DPI from its first 3 pages.
+
+    If none of those carries an image (blank covers, TOCs), the middle and
+    last pages are tried before giving up.
+    """
+    doc = None
     try:
         doc = pdfium.PdfDocument(str(pdf_path))
         n = len(doc)
-        sample = list(range(min(3, n)))
+        head = list(range(min(3, n)))
+        fallback = [i for i in dict.fromkeys((n // 2, n - 1)) if i >= 3]
         all_dpis = []
-        for i in sample:
-            d = _estimate_page_dpi(doc[i])
-            if d is not None:
-                all_dpis.append(d)
+        for sample in (head, fallback):
+            for i in sample:
+                page = doc[i]
+                try:
+                    d = _estimate_page_dpi(page)
+                finally:
+                    page.close()
+                if d is not None:
+                    all_dpis.append(d)
+            if all_dpis:
+                break
         if all_dpis:
-            all_dpis.sort()
-            return round(all_dpis[len(all_dpis) // 2])
+            return round(median_high(all_dpis))
     except Exception as e:
         print(f"    error: {e}")
+    finally:
+        if doc is not None:
+            doc.close()
     return None
 
 
@@ -91,6 +123,8 @@ def main():
     parser.add_argument("--dry-run", action="store_true")
     parser.add_argument("--collection-slug", default=None,
                         help="Collection slug from data/collections.json")
+    parser.add_argument("--workers", type=int, default=min(os.cpu_count() or 1, 8),
+                        help="Parallel processes for DPI estimation (default: min(cpus, 8))")
     args = parser.parse_args()
 
     if args.collection_slug:
@@ -108,6 +142,9 @@ def main():
     skipped = 0
     no_images = 0
 
+    # (item, pdf_path) pairs that need an actual pdfium scan
+    candidates = []
+
     for item in inventory:
         key = item["key"]
         pdf_path_rel = item.get("pdf_path")
@@ -136,16 +173,33 @@ def main():
             print(f"  {key}: 0 DPI (born-digital)")
             continue
 
-        dpi = estimate_pdf_dpi(pdf_path)
-
-        if dpi is not None:
-            item["pdf_dpi"] = dpi
-            updated += 1
-            print(f"  {key}: {dpi} DPI")
-        else:
-            no_images += 1
-            if scanned % 20 == 0:
-                print(f"  ... scanned {scanned} PDFs so far")
+        candidates.append((item, pdf_path))
+
+    # Scan PDFs in parallel; inventory is only mutated here on the main process
+    if candidates:
+        workers = max(1, min(args.workers, len(candidates)))
+        print(f"Scanning {len(candidates)} PDFs with {workers} worker(s)...")
+        done = 0
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            futures = {ex.submit(estimate_pdf_dpi, pdf_path): item
+                       for item, pdf_path in candidates}
+            for future in as_completed(futures):
+                item = futures[future]
+                done += 1
+                try:
+                    dpi = future.result()
+                except Exception as e:
+                    print(f"    {item['key']}: error: {e}")
+                    dpi = None
+
+                if dpi is not None:
+                    item["pdf_dpi"] = dpi
+                    updated += 1
+                    print(f"  {item['key']}: {dpi} DPI")
+                else:
+                    no_images += 1
+                    if done % 20 == 0:
+                        print(f"  ... scanned {done} PDFs so far")
 
     print(f"\nResults: {scanned} PDFs scanned, {updated} DPI values set, "
           f"{no_images} had no embedded images, {skipped} skipped")
@@ -156,7 +210,7 @@ def main():
 
     if updated:
         tmp = inv_path.with_suffix(".tmp.json")
-        tmp.write_text(json.dumps(inventory, indent=2, ensure_ascii=False), encoding="utf-8")
+        write_json_list(inventory, tmp)
         tmp.replace(inv_path)
         print(f"Updated {inv_path.name}")
     else:
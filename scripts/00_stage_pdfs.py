@@ -10,25 +10,33 @@ Each item in inventory.json gains provenance fields:
   pdf_staged_path     — relative path, e.g. "data/pdfs/QIGTV3FC.pdf"
   pdf_original_name   — original filename in Zotero
   pdf_zotero_key      — Zotero attachment item key
-  pdf_staged_at       — ISO timestamp
+  pdf_staged_at       — ISO timestamp of the staging run
 
 Designed to be re-run safely:
   - Already-fetched docs are skipped (unless --force)
-  - inventory.json is updated atomically after each download
+  - Downloads run on a small thread pool (--workers)
+  - Each download is appended to inventory.staged.log (a write-ahead log)
+  - inventory.json is updated atomically every SAVE_EVERY downloads and at exit;
+    a leftover log from an interrupted run is replayed on the next start
 
 Usage:
     python scripts/00_stage_pdfs.py              # fetch all available PDFs
     python scripts/00_stage_pdfs.py --dry-run    # preview without downloading
     python scripts/00_stage_pdfs.py --keys KEY1  # fetch specific docs
     python scripts/00_stage_pdfs.py --force      # re-fetch even if already done
+    python scripts/00_stage_pdfs.py --workers 4  # parallel downloads (default 8)
 """
 
 from __future__ import annotations
 
 import argparse
+import functools
 import json
+import os
 import sys
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 _ROOT = Path(__file__).parent.parent
@@ -36,6 +44,11 @@ INV_PATH         = _ROOT / "data" / "inventory.json"
 PDFS_DIR         = _ROOT / "data" / "pdfs"
 COLLECTIONS_PATH = _ROOT / "data" / "collections.json"
 
+SAVE_EVERY = 50   # checkpoint inventory.json every N staged PDFs
+
+PROVENANCE_FIELDS = ("pdf_staged_path", "pdf_original_name",
+                     "pdf_staged_at", "pdf_zotero_key")
+
 sys.path.insert(0, str(_ROOT / "src"))
 
 try:
@@ -44,7 +57,10 @@ try:
 except ImportError:
     pass
 
+from json_io import write_json_list
 
+
+@functools.lru_cache(maxsize=None)
 def _get_collection_paths(slug: str | None) -> tuple[Path, Path]:
     """Return (inv_path, pdfs_dir) for the given collection slug."""
     if not slug:
@@ -66,12 +82,45 @@ def _get_collection_paths(slug: str | None) -> tuple[Path, Path]:
 def _save_inventory(inventory: list, inv_path: Path = INV_PATH):
     """Atomic write."""
     tmp = inv_path.with_suffix(".tmp.json")
-    tmp.write_text(json.dumps(inventory, indent=2, ensure_ascii=False), encoding="utf-8")
+    write_json_list(inventory, tmp)
     tmp.replace(inv_path)
 
 
-def _mark_staged_in_status(key: str, inv_path: Path) -> None:
-    """Update import_status.json to mark a Zotero-staged PDF as stored/done.
+def _apply_staged(item: dict, result: dict) -> None:
+    """Copy provenance fields from a fetch result onto its inventory item."""
+    for field in PROVENANCE_FIELDS:
+        if field in result:
+            item[field] = result[field]
+    item["pdf_status"] = "stored"
+    item["pdf_path"] = result.get("pdf_staged_path")
+
+
+def _replay_staged_log(inventory: list, log_path: Path) -> list[str]:
+    """Re-apply staged entries left in the log by an interrupted run.
+
+    Returns the keys that were replayed.
+    """
+    try:
+        f = open(log_path, encoding="utf-8")
+    except FileNotFoundError:
+        return []
+    by_key = {item["key"]: item for item in inventory}
+    replayed = []
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue  # torn final line from a crash
+            item = by_key.get(entry.get("key"))
+            if item is not None:
+                _apply_staged(item, entry)
+                replayed.append(entry["key"])
+    return replayed
+
+
+def _mark_staged_in_status(keys: list[str], inv_path: Path) -> None:
+    """Update import_status.json to mark Zotero-staged PDFs as stored/done.
 
     The availability scan skips items that already have an 'availability' value,
     so without this update a previously-scanned 'unavailable' item would never
@@ -79,20 +128,19 @@ def _mark_staged_in_status(key: str, inv_path: Path) -> None:
     """
     import time as _time
     status_path = inv_path.parent / "import_status.json"
-    if status_path.exists():
-        try:
-            status = json.loads(status_path.read_text(encoding="utf-8"))
-        except Exception:
-            status = {}
-    else:
+    try:
+        status = json.loads(status_path.read_text(encoding="utf-8"))
+    except Exception:  # missing or unreadable
         status = {}
 
     items = status.setdefault("items", {})
-    entry = items.get(key, {})
-    entry["availability"]  = "stored"
-    entry["import_status"] = "done"
-    entry["last_updated"]  = _time.strftime("%Y-%m-%dT%H:%M:%SZ", _time.gmtime())
-    items[key] = entry
+    now = _time.strftime("%Y-%m-%dT%H:%M:%SZ", _time.gmtime())
+    for key in keys:
+        entry = items.get(key, {})
+        entry["availability"]  = "stored"
+        entry["import_status"] = "done"
+        entry["last_updated"]  = now
+        items[key] = entry
 
     tmp = status_path.with_suffix(".tmp.json")
     tmp.write_text(json.dumps(status, indent=2, ensure_ascii=False), encoding="utf-8")
@@ -101,10 +149,13 @@ def _mark_staged_in_status(key: str, inv_path: Path) -> None:
 
 def fetch_pdf(library, item: dict, children_by_parent: dict,
               pdfs_dir: Path, dry_run: bool = False,
-              force: bool = False) -> dict:
+              force: bool = False, staged_at: str | None = None) -> dict:
     """
     Download one PDF from Zotero's cloud to data/pdfs/{key}.pdf.
     Returns a result dict with status and provenance fields.
+
+    ``staged_at`` is the run's timestamp (shared by every item it stages);
+    defaults to now.
     """
     key = item["key"]
     dest = pdfs_dir / f"{key}.pdf"
@@ -147,13 +198,13 @@ def fetch_pdf(library, item: dict, children_by_parent: dict,
         "pdf_staged_path": str(dest.relative_to(_ROOT)),
         "pdf_original_name": att_info["filename"],
         "pdf_zotero_key": att_info["key"],
-        "pdf_staged_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "pdf_staged_at": staged_at or time.strftime("%Y-%m-%dT%H:%M:%S"),
     }
 
     return {
         "key": key,
         "status": "staged",
-        "size_mb": dest.stat().st_size / (1024 * 1024),
+        "size_mb": len(file_bytes) / (1024 * 1024),
         **provenance,
     }
 
@@ -170,6 +221,8 @@ def main():
     parser.add_argument("--collection-slug", default=None,
                         help="Collection slug from data/collections.json "
                              "(default: root collection)")
+    parser.add_argument("--workers", type=int, default=min(8, os.cpu_count() or 1),
+                        help="Parallel downloads (default: min(8, cpus))")
     args = parser.parse_args()
 
     from zotero_client import ZoteroLibrary
@@ -182,7 +235,16 @@ def main():
         pdfs_dir = PDFS_DIR
 
     inventory = json.loads(inv_path.read_text("utf-8"))
-    key_to_idx = {item["key"]: i for i, item in enumerate(inventory)}
+
+    # Write-ahead log of staged items since the last inventory.json checkpoint
+    log_path = inv_path.with_suffix(".staged.log")
+    replayed = _replay_staged_log(inventory, log_path)
+    if replayed:
+        print(f"Replayed {len(replayed)} staged item(s) from {log_path.name}")
+        if not args.dry_run:
+            _save_inventory(inventory, inv_path)
+            _mark_staged_in_status(replayed, inv_path)
+            log_path.unlink()
 
     # Connect to Zotero and fetch all items + children in one call
     try:
@@ -214,48 +276,74 @@ def main():
 
     staged = skipped = missing = failed = 0
     total = len(candidates)
-
-    for item in candidates:
-        result = fetch_pdf(library, item, children_by_parent,
-                           pdfs_dir, dry_run=args.dry_run, force=args.force)
-        status = result["status"]
-        key = result["key"]
-
-        if status == "staged":
-            staged += 1
-            mb = result.get("size_mb", 0)
-            att_key = result.get("pdf_zotero_key", "")
-            print(f"  + {key}  {mb:.1f} MB  <- {result.get('pdf_original_name', '')}"
-                  f"  [att:{att_key}]")
-            # Update inventory item in place
-            idx = key_to_idx.get(key)
-            if idx is not None:
-                for field in ("pdf_staged_path", "pdf_original_name",
-                              "pdf_staged_at", "pdf_zotero_key"):
-                    if field in result:
-                        inventory[idx][field] = result[field]
-                inventory[idx]["pdf_status"] = "stored"
-                inventory[idx]["pdf_path"] = result.get("pdf_staged_path")
-            # Save after each doc (resume-safe)
-            if not args.dry_run:
-                _save_inventory(inventory, inv_path)
-                _mark_staged_in_status(key, inv_path)
-
-        elif status == "already_staged":
-            skipped += 1
-
-        elif status == "dry_run":
-            staged += 1
-            print(f"  [dry] {key}  -> {result.get('dest', '')}  "
-                  f"({result.get('filename', '')})")
-
-        elif status == "no_attachment":
-            missing += 1
-
-        elif status in ("download_failed", "linked_file"):
-            failed += 1
-            detail = result.get("detail", result.get("attachment_key", ""))
-            print(f"  x {key}  {status}: {detail}")
+    pending: list[str] = []   # staged keys not yet checkpointed to disk
+    log = None if args.dry_run else open(log_path, "a", encoding="utf-8")
+
+    def _checkpoint():
+        if pending and not args.dry_run:
+            _save_inventory(inventory, inv_path)
+            _mark_staged_in_status(pending, inv_path)
+            pending.clear()
+            log.truncate(0)
+
+    staged_at = time.strftime("%Y-%m-%dT%H:%M:%S")
+
+    # pyzotero keeps per-request state on the client instance, so each
+    # download thread gets its own ZoteroLibrary
+    local = threading.local()
+
+    def _fetch(item):
+        if not hasattr(local, "library"):
+            local.library = ZoteroLibrary()
+        return fetch_pdf(local.library, item, children_by_parent,
+                         pdfs_dir, dry_run=args.dry_run, force=args.force,
+                         staged_at=staged_at)
+
+    # Downloads overlap on the pool; results are consumed (and inventory
+    # mutated) on this thread only, so no locking is needed.
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        try:
+            # candidates hold references to the inventory dicts, so results
+            # are applied to ``item`` directly
+            for item, result in zip(candidates, ex.map(_fetch, candidates)):
+                status = result["status"]
+                key = result["key"]
+
+                if status == "staged":
+                    staged += 1
+                    mb = result.get("size_mb", 0)
+                    att_key = result.get("pdf_zotero_key", "")
+                    print(f"  + {key}  {mb:.1f} MB  <- {result.get('pdf_original_name', '')}"
+                          f"  [att:{att_key}]")
+                    _apply_staged(item, result)
+                    # Log now (crash-safe), rewrite inventory.json periodically
+                    entry = {"key": key, **{f: result[f] for f in PROVENANCE_FIELDS}}
+                    log.write(json.dumps(entry, ensure_ascii=False) + "\n")
+                    log.flush()
+                    pending.append(key)
+                    if len(pending) >= SAVE_EVERY:
+                        _checkpoint()
+
+                elif status == "already_staged":
+                    skipped += 1
+
+                elif status == "dry_run":
+                    staged += 1
+                    print(f"  [dry] {key}  -> {result.get('dest', '')}  "
+                          f"({result.get('filename', '')})")
+
+                elif status == "no_attachment":
+                    missing += 1
+
+                elif status in ("download_failed", "linked_file"):
+                    failed += 1
+                    detail = result.get("detail", result.get("attachment_key", ""))
+                    print(f"  x {key}  {status}: {detail}")
+        finally:
+            _checkpoint()
+            if log is not None:
+                log.close()
+                log_path.unlink(missing_ok=True)
 
     print()
     print(f"{'[dry] ' if args.dry_run else ''}Fetched: {staged}  "
@@ -3,7 +3,14 @@
 Verify environment and Zotero connection.
 Run this first to check everything is working.
 """
+import io
+import json
+import os
+import re
+import shutil
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import subprocess
 
@@ -14,15 +21,68 @@ from zotero_client import ZoteroLibrary
 from dotenv import load_dotenv
 
 
+TESS_LANGS_CACHE = Path.home() / '.cache' / 'islamic-cartography' / 'tesseract_langs.json'
+
+
+def _mtime(path) -> float | None:
+    try:
+        return os.stat(path).st_mtime
+    except OSError:
+        return None
+
+
+def _tesseract_langs() -> str:
+    """Return `tesseract --list-langs` output, cached across runs.
+
+    The cache is invalidated when the tesseract binary or its tessdata
+    directory (where language packs are installed) changes.
+    """
+    bin_path = shutil.which('tesseract')
+    if bin_path is None:
+        raise FileNotFoundError('tesseract')
+    bin_mtime = _mtime(bin_path)
+
+    try:
+        cached = json.loads(TESS_LANGS_CACHE.read_text(encoding='utf-8'))
+        if (cached.get('bin') == bin_path and cached.get('bin_mtime') == bin_mtime
+                and cached.get('tessdata_mtime') == _mtime(cached.get('tessdata', ''))):
+            return cached['langs']
+    except (OSError, ValueError, KeyError):
+        pass
+
+    result = subprocess.run(
+        [bin_path, '--list-langs'],
+        capture_output=True,
+        text=True
+    )
+    langs = result.stdout
+
+    # First line: List of available languages in "/opt/.../tessdata/" (N):
+    m = re.search(r'"([^"]+)"', langs + result.stderr)
+    tessdata = m.group(1) if m else ''
+
+    # Only cache a good listing — a failed run (e.g. broken tessdata path)
+    # would otherwise be reused until the binary or tessdata changes
+    if result.returncode != 0 or not any(l.strip() for l in langs.splitlines()[1:]):
+        return langs
+    try:
+        TESS_LANGS_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        TESS_LANGS_CACHE.write_text(json.dumps({
+            'bin': bin_path,
+            'bin_mtime': bin_mtime,
+            'tessdata': tessdata,
+            'tessdata_mtime': _mtime(tessdata) if tessdata else None,
+            'langs': langs,
+        }), encoding='utf-8')
+    except OSError:
+        pass  # cache is best-effort
+    return langs
+
+
 def check_tesseract():
     """Verify Tesseract is installed with Arabic support."""
     try:
-        result = subprocess.run(
-            ['tesseract', '--list-langs'],
-            capture_output=True,
-            text=True
-        )
-        langs = result.stdout
+        langs = _tesseract_langs()
 
         if 'ara' not in langs:
             print("❌ Tesseract found but missing Arabic language pack")
@@ -92,6 +152,31 @@ def check_google_credentials():
     return True
 
 
+class _ThreadOutput(io.TextIOBase):
+    """sys.stdout stand-in that routes writes to a per-thread buffer, if set."""
+
+    def __init__(self, real):
+        self._real = real
+        self._local = threading.local()
+
+    def capture(self) -> io.StringIO:
+        self._local.buf = io.StringIO()
+        return self._local.buf
+
+    def write(self, s):
+        buf = getattr(self._local, 'buf', None)
+        return (buf or self._real).write(s)
+
+    def flush(self):
+        self._real.flush()
+
+
+def _run_captured(out: _ThreadOutput, check_func):
+    """Run a check on a worker thread, returning (result, printed output)."""
+    buf = out.capture()
+    return check_func(), buf.getvalue()
+
+
 def main():
     """Run all setup checks."""
     load_dotenv()
@@ -106,10 +191,23 @@ def main():
         ("Google Cloud (optional)", check_google_credentials),
     ]
 
+    # The checks are independent (subprocess, Zotero HTTP, env lookup), so run
+    # them concurrently and replay each one's output in the original order.
+    real_stdout = sys.stdout
+    out = _ThreadOutput(real_stdout)
+    sys.stdout = out
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as ex:
+            futs = [ex.submit(_run_captured, out, fn) for _, fn in checks]
+            outcomes = [f.result() for f in futs]
+    finally:
+        sys.stdout = real_stdout
+
     results = []
-    for name, check_func in checks:
+    for (name, _), (ok, text) in zip(checks, outcomes):
         print(f"\nChecking {name}...")
-        results.append(check_func())
+        print(text, end='')
+        results.append(ok)
 
     print("\n" + "="*50)
     if all(results[:2]):  # First 2 are required
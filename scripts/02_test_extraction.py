@@ -5,17 +5,25 @@ Test multi-witness extraction on sample documents.
 Execution model
 ---------------
 For each document:
-  1. Docling (persistent warm process) + Vision (fresh process per doc) run in parallel.
-     The Docling worker loads models ONCE at startup — no per-doc model loading overhead.
+  1. Docling + Vision run in parallel, each in its own persistent warm process.
+     Workers import their libraries and load models ONCE at startup — no
+     per-doc spawn/import/model-loading overhead.
   2. Vision agreement score is computed page-by-page against Docling
   3a. Agreement ≥ threshold → Docling accepted, Tesseract skipped
-  3b. Agreement < threshold → Tesseract runs in a child PROCESS
+  3b. Agreement < threshold → Tesseract runs in its persistent worker PROCESS
+      (killed and restarted on timeout / memory abort)
+
+The next document is queued on Docling + Vision as soon as phase 1 of the
+current one finishes, so Docling works ahead while Tesseract runs.
 
 Text storage
 ------------
 Each extractor's text is saved to data/texts/{item_key}/{extractor}.md|txt
 The main JSON stores only metadata, quality scores, and file paths — not the
 raw text blobs, which can be hundreds of thousands of characters each.
+Each result is appended to a .jsonl log next to it; the JSON itself is
+rewritten every --save-every documents and at exit, and a leftover log from
+an interrupted run is merged on the next start.
 
 Usage:
     python scripts/02_test_extraction.py --samples 5
@@ -25,13 +33,19 @@ Usage:
 """
 import sys
 import multiprocessing as mp
-import queue as _queue
+import multiprocessing.connection as mp_connection
 from pathlib import Path
 import argparse
 import json
 import time
 import subprocess
 import os as _os
+import functools
+import hashlib
+import http.client
+import shutil
+import signal
+from concurrent.futures import ThreadPoolExecutor
 
 # ── psutil (optional — for memory monitoring) ─────────────────────────────────
 try:
@@ -45,9 +59,8 @@ sys.path.insert(0, _SRC)
 
 from dotenv import load_dotenv
 from zotero_client import ZoteroLibrary
-from extractors import DoclingExtractor, TesseractExtractor, VisionExtractor
 from quality import compute_quality_metrics
-from quality.similarity import compute_similarity
+from quality.similarity import compute_similarity_batch
 from language_detector import detect_and_format
 
 
@@ -57,35 +70,70 @@ DOCLING_STARTUP_TIMEOUT = 120    # seconds to wait for Docling models to load
 VISION_THRESHOLD        = 0.5
 VISION_PAGES            = 3
 MEM_ABORT_GB            = 4.0
+STATUS_INTERVAL         = 2      # seconds between status-line redraws
+SAVE_EVERY              = 25     # rewrite the results JSON every N documents
+LANG_SAMPLE_CHARS       = 16384  # language ID converges long before this
+TESS_WORKERS            = min(4, _os.cpu_count() or 1)
 NOTIFY_TITLE            = "Islamic Cartography Pipeline"
 _NTFY_TOPIC             = _os.getenv('NTFY_TOPIC', '')
 
 
 # ── Memory helper ─────────────────────────────────────────────────────────────
 
-def _mem_gb() -> float | None:
-    """Current process RSS in GB, or None if psutil unavailable."""
+_PAGE_SIZE = _os.sysconf('SC_PAGE_SIZE') if hasattr(_os, 'sysconf') else 4096
+
+
+def _mem_gb(pid: int | None = None) -> float | None:
+    """
+    RSS in GB of ``pid`` (default: this process), or None if unavailable.
+
+    Reads /proc/<pid>/statm directly on Linux; psutil is the fallback
+    elsewhere (macOS).
+    """
+    try:
+        with open(f"/proc/{pid or 'self'}/statm", 'rb') as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE / (1024 ** 3)
+    except (OSError, ValueError, IndexError):
+        pass
     if not _PSUTIL:
         return None
     try:
-        return psutil.Process().memory_info().rss / (1024 ** 3)
+        return psutil.Process(pid).memory_info().rss / (1024 ** 3)
     except Exception:
         return None
 
 
 # ── Notifications ─────────────────────────────────────────────────────────────
 
+_ntfy_conn = None                       # keep-alive connection to ntfy.sh
+_OSASCRIPT = shutil.which('osascript')  # macOS only
+
+
+def _ntfy_post(body: str):
+    """POST to ntfy.sh over a reused HTTPS connection (one retry if it went stale)."""
+    global _ntfy_conn
+    for _ in range(2):
+        if _ntfy_conn is None:
+            _ntfy_conn = http.client.HTTPSConnection('ntfy.sh', timeout=5)
+        try:
+            _ntfy_conn.request('POST', f'/{_NTFY_TOPIC}', body=body.encode('utf-8'),
+                               headers={'Title': NOTIFY_TITLE, 'Priority': 'default'})
+            _ntfy_conn.getresponse().read()
+            return
+        except (OSError, http.client.HTTPException):
+            _ntfy_conn.close()
+            _ntfy_conn = None
+
+
 def notify(message: str, subtitle: str = "", sound: str = "Ping"):
     full = f"{subtitle} — {message}" if subtitle else message
     if _NTFY_TOPIC:
         try:
-            subprocess.run(
-                ['curl', '-s', '-X', 'POST', f'https://ntfy.sh/{_NTFY_TOPIC}',
-                 '-H', f'Title: {NOTIFY_TITLE}', '-H', 'Priority: default', '-d', full],
-                check=False, capture_output=True, timeout=5
-            )
+            _ntfy_post(full)
         except Exception:
             pass
+    if not _OSASCRIPT:
+        return
     script = (
         f'display notification {json.dumps(message)}'
         f' with title {json.dumps(NOTIFY_TITLE)}'
@@ -93,8 +141,8 @@ def notify(message: str, subtitle: str = "", sound: str = "Ping"):
         + f' sound name "{sound}"'
     )
     try:
-        subprocess.run(['osascript', '-e', script], check=False, capture_output=True)
-    except FileNotFoundError:
+        subprocess.run([_OSASCRIPT, '-e', script], check=False, capture_output=True)
+    except OSError:
         pass
 
 
@@ -110,265 +158,443 @@ def _exc_error(name, exc):
             'metadata': {'success': False}, 'page_texts': {},
             'error': str(exc)}
 
+def _skipped(name):
+    return {'text': None, 'confidence': 0.0, 'method': name,
+            'metadata': {'success': False, 'skipped': True}, 'page_texts': {},
+            'error': None}
+
 
 # ── Child-process workers (module-level → picklable with spawn) ───────────────
 
-def _docling_persistent_worker(task_queue: mp.Queue, result_queue: mp.Queue):
+def _docling_persistent_worker(task_conn, result_conn, tag: str):
     """
     Long-lived Docling worker: load models ONCE, then process documents on demand.
 
-    Protocol:
-      task_queue  ← (doc_id: int, file_path_str: str)  or  None (shutdown)
-      result_queue → ('ready',    None,   None)         on successful init
-                   → ('init_err', None,   error_str)    on init failure
-                   → ('ok',       doc_id, result_dict)  per document
-                   → ('err',      doc_id, error_str)    per document error
+    Protocol (one-way pipes, one pair per worker):
+      task_conn   ← (doc_id: int, file_path_str: str)  or  None / EOF (shutdown)
+      result_conn → ('ready',    tag, None,   None)         on successful init
+                  → ('init_err', tag, None,   error_str)    on init failure
+                  → ('ok',       tag, doc_id, result_dict)  per document
+                  → ('err',      tag, doc_id, error_str)    per document error
+
+    The tag says which worker a message came from when the main process
+    waits on several result pipes at once.
+
+    No load_dotenv()/sys.path setup here: main() loads .env before any worker
+    is started, so the environment is inherited, and importing this module
+    in the child (spawn) or forkserver already puts src/ on sys.path.
     """
-    sys.path.insert(0, _SRC)
-    load_dotenv()
     from extractors.docling_extractor import DoclingExtractor
     try:
         ext = DoclingExtractor()
-        result_queue.put(('ready', None, None))
+        result_conn.send(('ready', tag, None, None))
     except Exception as e:
-        result_queue.put(('init_err', None, str(e)))
+        result_conn.send(('init_err', tag, None, str(e)))
         return
 
     while True:
-        msg = task_queue.get()
+        try:
+            msg = task_conn.recv()
+        except EOFError:         # main process went away
+            break
         if msg is None:          # shutdown sentinel
             break
         doc_id, file_path_str = msg
         try:
             result = ext.extract(Path(file_path_str))
-            result_queue.put(('ok', doc_id, result))
+            result_conn.send(('ok', tag, doc_id, result))
         except Exception as e:
-            result_queue.put(('err', doc_id, str(e)))
+            result_conn.send(('err', tag, doc_id, str(e)))
 
 
-def _vision_worker(file_path_str: str, n_pages: int, result_queue: mp.Queue):
+def _vision_persistent_worker(task_conn, result_conn, tag: str):
+    """
+    Long-lived Vision worker: import google.cloud.vision and build the client ONCE.
+
+    Same protocol as _docling_persistent_worker, except that tasks carry the
+    number of pages to sample: (doc_id, file_path_str, n_pages).
+    """
+    from extractors.vision_extractor import VisionExtractor
     try:
-        sys.path.insert(0, _SRC)
-        load_dotenv()
-        from extractors.vision_extractor import VisionExtractor
-        ext    = VisionExtractor()
-        result = ext.extract(Path(file_path_str), page_indices=list(range(n_pages)))
-        result_queue.put(('ok', result))
+        ext = VisionExtractor()
+        result_conn.send(('ready', tag, None, None))
     except Exception as e:
-        result_queue.put(('err', str(e)))
+        result_conn.send(('init_err', tag, None, str(e)))
+        return
+
+    while True:
+        try:
+            msg = task_conn.recv()
+        except EOFError:         # main process went away
+            break
+        if msg is None:          # shutdown sentinel
+            break
+        doc_id, file_path_str, n_pages = msg
+        try:
+            result = ext.extract(Path(file_path_str), page_indices=list(range(n_pages)))
+            result_conn.send(('ok', tag, doc_id, result))
+        except Exception as e:
+            result_conn.send(('err', tag, doc_id, str(e)))
+
 
+def _tesseract_persistent_worker(task_conn, result_conn, tag: str, n_workers: int = 1):
+    """
+    Long-lived Tesseract worker: import pytesseract/pdf2image ONCE.
+
+    Same protocol as _docling_persistent_worker, except that tasks carry the
+    Tesseract language string: (doc_id, file_path_str, lang).  Pages are
+    OCR'd ``n_workers`` at a time.
 
-def _tesseract_worker(file_path_str: str, lang: str, result_queue: mp.Queue):
+    The worker leads its own process group, so _kill_worker also stops the
+    tesseract / pdftoppm subprocesses it has running on a timeout.
+    """
+    if hasattr(_os, 'setpgrp'):
+        _os.setpgrp()
+    from extractors.tesseract_extractor import TesseractExtractor
     try:
-        sys.path.insert(0, _SRC)
-        load_dotenv()
-        from extractors.tesseract_extractor import TesseractExtractor
-        ext    = TesseractExtractor()
-        result = ext.extract(Path(file_path_str), lang=lang)
-        result_queue.put(('ok', result))
+        ext = TesseractExtractor(workers=n_workers)
+        result_conn.send(('ready', tag, None, None))
     except Exception as e:
-        result_queue.put(('err', str(e)))
+        result_conn.send(('init_err', tag, None, str(e)))
+        return
+
+    while True:
+        try:
+            msg = task_conn.recv()
+        except EOFError:         # main process went away
+            break
+        if msg is None:          # shutdown sentinel
+            break
+        doc_id, file_path_str, lang = msg
+        try:
+            result = ext.extract(Path(file_path_str), lang=lang)
+            result_conn.send(('ok', tag, doc_id, result))
+        except Exception as e:
+            result_conn.send(('err', tag, doc_id, str(e)))
 
 
-# ── Persistent Docling worker manager ─────────────────────────────────────────
+# ── Persistent worker management ──────────────────────────────────────────────
 
-def start_docling_worker(startup_timeout: int = DOCLING_STARTUP_TIMEOUT):
+def _start_persistent_worker(target, label: str, startup_timeout: int,
+                             progress: bool = True, extra_args: tuple = ()):
     """
-    Start the persistent Docling worker and block until models are loaded.
-    Returns (process, task_queue, result_queue).
+    Start a persistent worker and block until it reports 'ready'.
+    Returns (process, task_conn, result_conn).
     Raises RuntimeError on failure or timeout.
+
+    Each worker gets its own pair of one-way pipes — there is exactly one
+    producer and one consumer per direction, so mp.Queue's feeder thread
+    and lock buy nothing.  Messages are tagged with ``label.lower()``.
+
+    With progress=False the live "[Ns]" counter is suppressed and a single
+    line is printed once ready — use this when starting several workers
+    from threads so their status lines do not interleave.
     """
-    task_q   = mp.Queue()
-    result_q = mp.Queue()
+    task_r,   task_w   = mp.Pipe(duplex=False)
+    result_r, result_w = mp.Pipe(duplex=False)
     proc = mp.Process(
-        target=_docling_persistent_worker,
-        args=(task_q, result_q),
+        target=target,
+        args=(task_r, result_w, label.lower(), *extra_args),
         daemon=True,
     )
     proc.start()
-    t0 = time.time()
-    print(f"  Docling worker starting (loading models)...", end="", flush=True)
+    # Drop our copies of the child's ends so a dead worker reads as EOF
+    task_r.close()
+    result_w.close()
+    t0 = time.monotonic()
+    if progress:
+        print(f"  {label} worker starting...", end="", flush=True)
     deadline = t0 + startup_timeout
-    while time.time() < deadline:
-        try:
-            status, _, value = result_q.get(timeout=2)
+    while time.monotonic() < deadline:
+        if result_r.poll(STATUS_INTERVAL):
+            try:
+                status, _, _, value = result_r.recv()
+            except EOFError:
+                status, value = 'init_err', 'worker exited during startup'
             if status == 'ready':
-                elapsed = int(time.time() - t0)
-                print(f" ready ✓ [{elapsed}s]")
-                return proc, task_q, result_q
+                elapsed = int(time.monotonic() - t0)
+                if progress:
+                    print(f" ready ✓ [{elapsed}s]")
+                else:
+                    print(f"  {label} worker ready ✓ [{elapsed}s]")
+                return proc, task_w, result_r
             else:
-                proc.terminate(); proc.join()
-                raise RuntimeError(f"Docling worker init failed: {value}")
-        except _queue.Empty:
-            elapsed = int(time.time() - t0)
-            print(f"\r  Docling worker starting [{elapsed}s]...", end="", flush=True)
-    proc.terminate(); proc.join()
-    raise RuntimeError(f"Docling worker did not start within {startup_timeout}s")
+                _close_worker(proc, task_w, result_r)
+                raise RuntimeError(f"{label} worker init failed: {value}")
+        elif progress:
+            elapsed = int(time.monotonic() - t0)
+            print(f"\r  {label} worker starting [{elapsed}s]...", end="", flush=True)
+    _close_worker(proc, task_w, result_r)
+    raise RuntimeError(f"{label} worker did not start within {startup_timeout}s")
+
+
+def start_docling_worker(startup_timeout: int = DOCLING_STARTUP_TIMEOUT,
+                         progress: bool = True):
+    """Start the persistent Docling worker and block until models are loaded."""
+    return _start_persistent_worker(_docling_persistent_worker, 'Docling', startup_timeout,
+                                    progress)
+
+
+def start_vision_worker(startup_timeout: int = DOCLING_STARTUP_TIMEOUT,
+                        progress: bool = True):
+    """Start the persistent Vision worker and block until the client is ready."""
+    return _start_persistent_worker(_vision_persistent_worker, 'Vision', startup_timeout,
+                                    progress)
 
 
-# ── Phase 1: Docling (persistent) + Vision (fresh process) in parallel ────────
+def start_tesseract_worker(startup_timeout: int = DOCLING_STARTUP_TIMEOUT,
+                           progress: bool = True, workers: int = 1):
+    """Start the persistent Tesseract worker and block until it is ready."""
+    return _start_persistent_worker(_tesseract_persistent_worker, 'Tesseract', startup_timeout,
+                                    progress, (workers,))
+
+
+def _send_task(worker: tuple, task: tuple) -> bool:
+    """Send a task to a worker; False if the worker is gone (broken pipe)."""
+    try:
+        worker[1].send(task)
+        return True
+    except OSError:
+        return False
+
+
+def _kill_worker(proc: mp.Process):
+    """
+    Hard-stop a worker that is stuck on a task.
+
+    A worker that leads its own process group (Tesseract) is stopped with
+    its whole group, so the subprocesses it started are not orphaned.
+    """
+    try:
+        group = hasattr(_os, 'killpg') and _os.getpgid(proc.pid) == proc.pid
+    except (ProcessLookupError, TypeError):
+        group = False
+    if group:
+        _os.killpg(proc.pid, signal.SIGTERM)
+    else:
+        proc.terminate()
+    proc.join(timeout=3)
+    if proc.is_alive():
+        proc.kill()
+        proc.join()
+    if group:
+        try:
+            _os.killpg(proc.pid, signal.SIGKILL)     # any child that outlived it
+        except ProcessLookupError:
+            pass
+
+
+def _close_worker(proc: mp.Process, task_conn, result_conn):
+    """Kill a worker and release its pipes."""
+    _kill_worker(proc)
+    task_conn.close()
+    result_conn.close()
+
+
+def _stop_worker(proc: mp.Process, task_conn, result_conn):
+    """Send the shutdown sentinel and wait briefly for a clean exit."""
+    try:
+        task_conn.send(None)
+    except OSError:
+        pass                     # already dead
+    proc.join(timeout=5)
+    if proc.is_alive():
+        proc.terminate()
+    task_conn.close()
+    result_conn.close()
+
+
+# ── Phase 1: Docling + Vision (both persistent) in parallel ───────────────────
+
+def _print_phase1_status(names: list, results: dict, took: dict, elapsed: int):
+    mem     = _mem_gb()
+    mem_str = f"  [{mem:.1f}GB RAM]" if mem is not None else ""
+    parts   = []
+    for name in names:
+        res = results.get(name)
+        if res is None:
+            parts.append(f"{name.capitalize()} ⟳[{elapsed}s]")
+        elif res.get('metadata', {}).get('skipped'):
+            parts.append(f"{name.capitalize()} –")
+        else:
+            err  = res.get('error') or ''
+            icon = 'TIMEOUT' if 'timeout' in err else ('✗' if err else '✓')
+            parts.append(f"{name.capitalize()} {icon}[{took[name]}s]")
+    print(f"\r  {' | '.join(parts)}{mem_str}", end="", flush=True)
+
+
+def submit_phase1(attachment_path: Path, n_pages: int, docling_worker: tuple,
+                  doc_id: int, vision_worker: tuple | None) -> float:
+    """Queue a document on the Docling and Vision workers; returns the submit time."""
+    # A dead worker is reported by run_phase1_parallel (EOF on its result pipe)
+    _send_task(docling_worker, (doc_id, str(attachment_path)))
+    if vision_worker is not None:
+        _send_task(vision_worker, (doc_id, str(attachment_path), n_pages))
+    return time.monotonic()
+
 
 def run_phase1_parallel(
     attachment_path: Path,
     n_pages: int,
     timeout: int,
-    docling_task_q: mp.Queue,
-    docling_result_q: mp.Queue,
+    docling_worker: tuple,
     doc_id: int,
-    vision_available: bool,
+    vision_worker: tuple | None,
+    submitted_at: float | None = None,
+    skip_vision_conf: float | None = None,
 ) -> dict:
     """
-    Submit a task to the persistent Docling worker and run Vision in a fresh
-    process simultaneously.  Both results are collected within `timeout` seconds.
-
-    Docling timeouts do NOT kill the persistent worker — the stale result is
-    discarded the next time we check the result queue (doc_id mismatch).
+    Submit a task to the persistent Docling and Vision workers simultaneously.
+    Both results are collected within `timeout` seconds.
+
+    If the document was already queued by submit_phase1 (prefetched while
+    the previous document was still in Tesseract), pass its ``submitted_at``;
+    the timeout then runs from that moment and nothing is re-submitted.
+
+    With ``skip_vision_conf`` set, Vision is held back until Docling is done
+    and only submitted if Docling's confidence is below it; otherwise the
+    Vision result is marked skipped (metadata['skipped']).  Vision then gets
+    its own `timeout` from the moment it is submitted.  Docling's confidence
+    is a text-length check (0.9 over 100 chars, else 0.5), not a measure of
+    text quality.
+
+    We select() on both result pipes and wake as soon as either finishes,
+    redrawing the status line every STATUS_INTERVAL seconds in between.
+
+    A Docling timeout does NOT kill the persistent worker — the stale result
+    is discarded the next time we read that pipe (doc_id mismatch).  A Vision
+    timeout kills the Vision worker, since a hung API call would otherwise
+    hold up every later document; the caller checks ``is_alive()`` and
+    starts a fresh one, as for Tesseract.
     """
-    # Send task to warm Docling worker
-    docling_task_q.put((doc_id, str(attachment_path)))
-    docling_done   = False
-    docling_result = None
-
-    # Start Vision in a fresh process (quick startup — no heavy models)
-    vision_done   = not vision_available
-    vision_result = None
-    vision_proc   = None
-    vision_q      = None
-    if vision_available:
-        vision_q    = mp.Queue()
-        vision_proc = mp.Process(
-            target=_vision_worker,
-            args=(str(attachment_path), n_pages, vision_q),
-            daemon=True,
-        )
-        vision_proc.start()
-
-    start    = time.time()
-    deadline = start + timeout
+    conns = {docling_worker[2]: 'docling'}
+    if vision_worker is not None:
+        conns[vision_worker[2]] = 'vision'
+    names = list(conns.values())
+    defer_vision = vision_worker is not None and skip_vision_conf is not None
+
+    # Send task to warm Docling + Vision workers (unless prefetched)
+    if submitted_at is None:
+        submitted_at = submit_phase1(attachment_path, n_pages, docling_worker, doc_id,
+                                     None if defer_vision else vision_worker)
+
+    results   = {}
+    took      = {}
+    start     = submitted_at
+    deadlines = {name: start + timeout for name in names}
+    if defer_vision:
+        deadlines['vision'] = float('inf')   # not submitted until Docling is in
+    next_tick = start
+
+    while len(results) < len(names):
+        now = time.monotonic()
+
+        # Deferred Vision: decide once Docling is in
+        if defer_vision and 'docling' in results:
+            defer_vision = False
+            docling_result = results['docling']
+            if (not docling_result.get('error')
+                    and docling_result.get('confidence', 0.0) >= skip_vision_conf):
+                results['vision'] = _skipped('vision')
+                took['vision']    = 0
+            else:
+                _send_task(vision_worker, (doc_id, str(attachment_path), n_pages))
+                deadlines['vision'] = now + timeout
 
-    while True:
-        elapsed   = int(time.time() - start)
-        timed_out = time.time() >= deadline
+        if len(results) == len(names):
+            break
 
-        # Drain Docling result queue — discard stale results from prev timed-out docs
-        if not docling_done:
-            while True:
+        pending = [name for name in names if name not in results]
+        waiting = [c for c, name in conns.items()
+                   if name in pending and not (defer_vision and name == 'vision')]
+        wake    = min(next_tick, *(deadlines[name] for name in pending))
+        ready   = mp_connection.wait(waiting, timeout=max(0.0, wake - now))
+        if not ready:
+            next_tick = now + STATUS_INTERVAL
+        for conn in ready:
+            # Drain the pipe: stale results from an earlier timeout may be
+            # queued ahead of this document's result
+            name = conns[conn]
+            while name not in results and conn.poll():
                 try:
-                    status, rid, value = docling_result_q.get_nowait()
-                    if rid == doc_id:
-                        docling_result = value if status == 'ok' else _exc_error('docling', value)
-                        docling_done   = True
-                        break
-                    # else: stale result from a previous timeout — discard
-                except _queue.Empty:
+                    status, _, rid, value = conn.recv()
+                except EOFError:
+                    results[name] = _exc_error(name, 'worker exited without result')
+                    took[name]    = int(time.monotonic() - start)
                     break
+                if rid != doc_id:
+                    continue     # stale result from a previous timeout — discard
+                results[name] = value if status == 'ok' else _exc_error(name, value)
+                took[name]    = int(time.monotonic() - start)
+
+        # Deadlines are applied only after the ready pipes have been drained,
+        # so a result that arrived before this check is not reported as a
+        # timeout
+        now = time.monotonic()
+        for name in names:
+            if name not in results and now >= deadlines[name]:
+                if name == 'vision':
+                    _kill_worker(vision_worker[0])
+                # (Docling keeps running; its stale result is discarded next round)
+                results[name] = _timeout_error(name, timeout)
+                took[name]    = int(now - start)
+
+        _print_phase1_status(names, results, took, int(time.monotonic() - start))
+
+    _print_phase1_status(names, results, took, int(time.monotonic() - start))
+    print()
+    return {name: results[name] for name in names}
 
-        # Check Vision process
-        if not vision_done and vision_proc and not vision_proc.is_alive():
-            vision_proc.join()
-            try:
-                status, value = vision_q.get_nowait()
-                vision_result = value if status == 'ok' else _exc_error('vision', value)
-            except _queue.Empty:
-                vision_result = _exc_error('vision', 'process exited without result')
-            vision_done = True
-
-        # Handle timeouts
-        if timed_out:
-            if not docling_done:
-                docling_result = _timeout_error('docling', timeout)
-                docling_done   = True
-                # Persistent worker keeps running; stale result discarded next round
-            if not vision_done:
-                if vision_proc and vision_proc.is_alive():
-                    vision_proc.terminate()
-                    vision_proc.join(3)
-                    if vision_proc.is_alive():
-                        vision_proc.kill()
-                        vision_proc.join()
-                vision_result = _timeout_error('vision', timeout)
-                vision_done   = True
-
-        # Status line
-        mem     = _mem_gb()
-        mem_str = f"  [{mem:.1f}GB RAM]" if mem is not None else ""
-        parts   = []
-
-        if docling_done:
-            err  = (docling_result or {}).get('error') or ''
-            icon = 'TIMEOUT' if 'timeout' in err else ('✗' if err else '✓')
-            parts.append(f"Docling {icon}[{elapsed}s]")
-        else:
-            parts.append(f"Docling ⟳[{elapsed}s]")
-
-        if vision_available:
-            if vision_done:
-                err  = (vision_result or {}).get('error') or ''
-                icon = 'TIMEOUT' if 'timeout' in err else ('✗' if err else '✓')
-                parts.append(f"Vision {icon}[{elapsed}s]")
-            else:
-                parts.append(f"Vision ⟳[{elapsed}s]")
-
-        print(f"\r  {' | '.join(parts)}{mem_str}", end="", flush=True)
-
-        if docling_done and vision_done:
-            print()
-            break
-
-        time.sleep(1)
 
-    results = {'docling': docling_result or _exc_error('docling', 'no result')}
-    if vision_available:
-        results['vision'] = vision_result or _exc_error('vision', 'no result')
-    return results
+# ── Tesseract runner ──────────────────────────────────────────────────────────
 
+def run_tesseract_in_process(file_path: Path, lang: str | None, timeout: int,
+                             tess_worker: tuple, doc_id: int,
+                             mem_limit: float = MEM_ABORT_GB) -> dict:
+    """
+    Run Tesseract in the persistent worker with a hard kill on timeout or
+    once its RSS exceeds ``mem_limit`` GB.
 
-# ── Tesseract runner ──────────────────────────────────────────────────────────
+    A killed worker is not restarted here — the caller checks
+    ``proc.is_alive()`` and starts a fresh one before the next document.
+    """
+    proc, _, result_conn = tess_worker
+    if not _send_task(tess_worker, (doc_id, str(file_path), lang or 'eng')):
+        return _exc_error('tesseract', 'worker exited without result')
+    start    = time.monotonic()
+    deadline = start + timeout
 
-def run_tesseract_in_process(file_path: Path, lang: str | None, timeout: int) -> dict:
-    """Run Tesseract in a child process with a hard kill on timeout."""
-    q = mp.Queue()
-    p = mp.Process(
-        target=_tesseract_worker,
-        args=(str(file_path), lang or 'eng', q),
-        daemon=True,
-    )
-    p.start()
-    start = time.time()
+    while True:
+        now = time.monotonic()
+        if result_conn.poll(max(0.0, min(STATUS_INTERVAL, deadline - now))):
+            try:
+                status, _, rid, value = result_conn.recv()
+            except EOFError:
+                result = _exc_error('tesseract', 'worker exited without result')
+                break
+            if rid != doc_id:
+                continue     # stale result — discard
+            result = value if status == 'ok' else _exc_error('tesseract', value)
+            break
 
-    while p.is_alive():
-        elapsed = int(time.time() - start)
-        mem     = _mem_gb()
+        now     = time.monotonic()
+        elapsed = int(now - start)
+        mem     = _mem_gb(proc.pid)     # the worker holding the page images
         mem_str = f"  {mem:.1f}GB RAM" if mem else ""
         print(f"\r  Tesseract... [{elapsed}s{mem_str}]", end="", flush=True)
 
-        if elapsed >= timeout:
+        if now >= deadline:
             print(f"\r  Tesseract... TIMEOUT ({timeout}s) — killing          ")
-            p.terminate()
-            p.join(timeout=3)
-            if p.is_alive():
-                p.kill()
-                p.join()
+            _kill_worker(proc)
             return _timeout_error('tesseract', timeout)
 
-        if mem and mem > MEM_ABORT_GB:
-            print(f"\r  Tesseract... MEM ABORT ({mem:.1f}GB > {MEM_ABORT_GB}GB) — killing")
-            p.terminate()
-            p.join(timeout=3)
-            if p.is_alive():
-                p.kill()
-                p.join()
-            return _exc_error('tesseract', f'memory limit {MEM_ABORT_GB}GB exceeded')
+        if mem and mem > mem_limit:
+            print(f"\r  Tesseract... MEM ABORT ({mem:.1f}GB > {mem_limit}GB) — killing")
+            _kill_worker(proc)
+            return _exc_error('tesseract', f'memory limit {mem_limit}GB exceeded')
 
-        time.sleep(1)
-
-    p.join()
     print(f"\r  Tesseract... ", end="", flush=True)
-
-    if not q.empty():
-        status, value = q.get_nowait()
-        return value if status == 'ok' else _exc_error('tesseract', value)
-    return _exc_error('tesseract', 'process exited without result')
+    return result
 
 
 # ── Vision gate ───────────────────────────────────────────────────────────────
@@ -377,12 +603,29 @@ def vision_gate_score(docling_result: dict, vision_result: dict) -> float:
     """Page-aligned mean similarity between Vision samples and Docling pages."""
     vision_pages  = vision_result.get('page_texts', {})
     docling_pages = docling_result.get('page_texts', {})
-    scores = []
-    for idx, v_text in vision_pages.items():
-        d_text = docling_pages.get(idx + 1, '')
-        if v_text and d_text:
-            scores.append(compute_similarity(v_text, d_text))
-    return sum(scores) / len(scores) if scores else 0.0
+    pairs = [(v_text, docling_pages[idx + 1])
+             for idx, v_text in vision_pages.items()
+             if v_text and docling_pages.get(idx + 1)]
+    if not pairs:
+        return 0.0
+    scores = compute_similarity_batch(*map(list, zip(*pairs)))
+    return sum(scores) / len(scores)
+
+
+# ── Language sample ───────────────────────────────────────────────────────────
+
+def _lang_sample(text: str, max_chars: int = LANG_SAMPLE_CHARS, windows: int = 16) -> str:
+    """
+    Evenly spaced excerpts of ``text`` totalling at most ``max_chars``.
+
+    Spread across the whole document (not just a prefix) so a script that
+    only appears in later pages — e.g. an Arabic appendix — is still seen.
+    """
+    if len(text) <= max_chars:
+        return text
+    size = max_chars // windows
+    step = (len(text) - size) // (windows - 1)
+    return '\n'.join(text[i * step:i * step + size] for i in range(windows))
 
 
 # ── Text file storage ─────────────────────────────────────────────────────────
@@ -392,16 +635,17 @@ def save_text(item_key: str, extractor_name: str, text: str, texts_dir: Path) ->
     doc_dir.mkdir(parents=True, exist_ok=True)
     suffix  = 'md' if extractor_name == 'docling' else 'txt'
     path    = doc_dir / f"{extractor_name}.{suffix}"
-    path.write_text(text, encoding='utf-8')
+    # Encode once and hand the kernel a single buffer (no TextIOWrapper pass)
+    with open(path, 'wb') as f:
+        f.write(text.encode('utf-8'))
     return path
 
 
 def save_witness_texts(witnesses: dict, item_key: str, texts_dir: Path) -> dict:
     slimmed = {}
     for name, result in witnesses.items():
-        r    = dict(result)
-        text = r.pop('text', None)
-        r.pop('page_texts', None)
+        r    = {k: v for k, v in result.items() if k not in ('text', 'page_texts')}
+        text = result.get('text')
         if text:
             path           = save_text(item_key, name, text, texts_dir)
             r['text_path'] = str(path)
@@ -409,27 +653,86 @@ def save_witness_texts(witnesses: dict, item_key: str, texts_dir: Path) -> dict:
     return slimmed
 
 
-# ── Save ──────────────────────────────────────────────────────────────────────
+# ── Duplicate PDFs ────────────────────────────────────────────────────────────
+
+@functools.lru_cache(maxsize=None)
+def _file_digest(path: Path) -> str:
+    """blake2b of the file contents — identifies the same PDF under different items."""
+    with open(path, 'rb') as f:
+        if hasattr(hashlib, 'file_digest'):          # Python 3.11+
+            return hashlib.file_digest(f, 'blake2b').hexdigest()
+        h = hashlib.blake2b()
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+        return h.hexdigest()
 
-def _serializable(obj):
-    if isinstance(obj, dict):
-        return {k: _serializable(v) for k, v in obj.items()}
-    if isinstance(obj, list):
-        return [_serializable(i) for i in obj]
-    if isinstance(obj, (str, int, float, bool)) or obj is None:
-        return obj
-    return str(obj)
 
+def _dedup_record(prev: dict, key: str, title: str, attachment_path: Path,
+                  texts_dir: Path) -> dict:
+    """
+    Result record for a PDF identical to an already-processed one: copy the
+    previous item's text files under ``key`` and reuse its witnesses/quality.
+    """
+    src = texts_dir / prev['item_key']
+    if src.is_dir():
+        shutil.copytree(src, texts_dir / key, dirs_exist_ok=True)
+    witnesses = {}
+    for name, w in prev['witnesses'].items():
+        w = dict(w)
+        if w.get('text_path'):
+            w['text_path'] = str(texts_dir / key / Path(w['text_path']).name)
+        witnesses[name] = w
+    return {
+        **prev,
+        'item_key':  key,
+        'title':     title,
+        'file':      str(attachment_path),
+        'witnesses': witnesses,
+        'dedup_of':  prev.get('dedup_of', prev['item_key']),
+    }
+
+
+# ── Save ──────────────────────────────────────────────────────────────────────
 
 def save_results(results, output_path):
     output_path = Path(output_path)
     output_path.parent.mkdir(parents=True, exist_ok=True)
     tmp = output_path.with_suffix('.tmp.json')
     with open(tmp, 'w', encoding='utf-8') as f:
-        json.dump(_serializable(results), f, indent=2, ensure_ascii=False)
+        json.dump(results, f, indent=2, ensure_ascii=False, default=str)
     tmp.replace(output_path)
 
 
+def _append_result(log, record: dict):
+    """Append one result to the JSONL log — O(1) per document."""
+    log.write(json.dumps(record, ensure_ascii=False, default=str) + '\n')
+    log.flush()
+
+
+def _replay_results_log(results: list, log_path: Path) -> int:
+    """
+    Append results left in the log by an interrupted run to ``results``
+    (skipping keys already present).  Returns the number replayed.
+    """
+    try:
+        f = open(log_path, encoding='utf-8')
+    except FileNotFoundError:
+        return 0
+    seen     = {r['item_key'] for r in results}
+    replayed = 0
+    with f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue     # torn final line from a crash
+            if record.get('item_key') not in seen:
+                results.append(record)
+                seen.add(record['item_key'])
+                replayed += 1
+    return replayed
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
@@ -440,6 +743,9 @@ def main():
     parser.add_argument('--skip',         type=int,   default=0,
                         help='Skip first N documents by position')
     parser.add_argument('--output',       type=str,   default='data/test_results.json')
+    parser.add_argument('--save-every',   type=int,   default=SAVE_EVERY,
+                        help=f'Rewrite the results JSON every N documents (default {SAVE_EVERY}); '
+                             f'each result is appended to a .jsonl log in between')
     parser.add_argument('--texts-dir',    type=str,   default='data/texts',
                         help='Directory for per-document extracted text files (default: data/texts)')
     parser.add_argument('--timeout',      type=int,   default=EXTRACTOR_TIMEOUT,
@@ -448,13 +754,25 @@ def main():
                         help=f'Vision/Docling gate threshold (default {VISION_THRESHOLD})')
     parser.add_argument('--vision-pages', type=int,   default=VISION_PAGES,
                         help=f'Spread pages for Vision to sample (default {VISION_PAGES})')
+    parser.add_argument('--assume-lang',  type=str,   default=None,
+                        help='Tesseract language string to use for every document '
+                             '(e.g. eng+ara); skips language detection')
+    parser.add_argument('--skip-vision-conf', type=float, default=None,
+                        help='Skip Vision (and accept Docling) when Docling\'s confidence is at '
+                             'least this; Vision then waits for Docling instead of running '
+                             'alongside it (default: off).  Docling\'s confidence is only 0.9 '
+                             '(over 100 chars of text) or 0.5, so any value up to 0.9 skips '
+                             'Vision for every document with text, however poor the text is')
+    parser.add_argument('--tess-workers', type=int,   default=TESS_WORKERS,
+                        help=f'Pages OCR\'d in parallel by Tesseract (default {TESS_WORKERS})')
     parser.add_argument('--mem-limit',    type=float, default=MEM_ABORT_GB,
                         help=f'RAM limit in GB before aborting Tesseract (default {MEM_ABORT_GB})')
     args = parser.parse_args()
 
     texts_dir = Path(args.texts_dir)
 
-    mem_note = f"psutil ✓ (abort >{args.mem_limit}GB)" if _PSUTIL else "psutil ✗ (no memory monitoring)"
+    mem_note = (f"memory monitor ✓ (abort >{args.mem_limit}GB)" if _mem_gb() is not None
+                else "memory monitor ✗ (no /proc and no psutil)")
     print(f"Samples: {args.samples}  |  Skip: {args.skip}  |  Timeout: {args.timeout}s  "
           f"|  Threshold: {args.threshold}  |  {mem_note}")
     print("Flow: Docling(persistent) ║ Vision(first N pages) → gate → Tesseract[process] only if needed")
@@ -486,47 +804,90 @@ def main():
         print("ERROR: No items to process after skip")
         return 1
 
-    # Validate extractors (quick import/init check in main process)
-    print("\nInitialising extractors...")
-    docling_available = tesseract_available = vision_available = False
-
-    try:
-        DoclingExtractor();  print("✓ Docling");       docling_available = True
-    except Exception as e:
-        print(f"⚠ Docling: {e}")
-    try:
-        TesseractExtractor(); print("✓ Tesseract");    tesseract_available = True
-    except Exception as e:
-        print(f"⚠ Tesseract: {e}")
-    try:
-        VisionExtractor();    print("✓ Google Vision"); vision_available = True
-    except Exception as e:
-        print(f"⚠ Google Vision: {e}")
-
-    if not docling_available:
-        print("\nERROR: Docling is required"); return 1
-
-    # Start persistent Docling worker — loads models once for all documents
-    print("\nStarting persistent Docling worker...")
-    try:
-        docling_proc, docling_task_q, docling_result_q = start_docling_worker()
-    except RuntimeError as e:
-        print(f"ERROR: {e}")
+    # Start persistent workers concurrently — Vision/Tesseract init overlaps
+    # with the (dominant) Docling model load.  Each worker's ready/init_err
+    # handshake is the availability check: models load only in the process
+    # that uses them.
+    print("\nStarting persistent workers...")
+    starters = {
+        'docling':   start_docling_worker,
+        'vision':    start_vision_worker,
+        'tesseract': functools.partial(start_tesseract_worker, workers=args.tess_workers),
+    }
+    with ThreadPoolExecutor(max_workers=len(starters)) as ex:
+        futures = {name: ex.submit(fn, progress=False) for name, fn in starters.items()}
+    workers = {}
+    for name, future in futures.items():
+        try:
+            workers[name] = future.result()
+        except RuntimeError as e:
+            print(f"{'ERROR' if name == 'docling' else '⚠'} {e}")
+
+    if 'docling' not in workers:
+        print("\nERROR: Docling is required")
+        for worker in workers.values():
+            _stop_worker(*worker)
         return 1
+    docling_worker = workers['docling']
+
+    # Vision and Tesseract workers are optional — fall back to "unavailable"
+    vision_worker = workers.get('vision')
+    tess_worker   = workers.get('tesseract')
+    vision_available    = vision_worker is not None
+    tesseract_available = tess_worker is not None
 
-    # Resume from existing results
+    # Resume from existing results (+ any log left by an interrupted run)
     output_path = Path(args.output)
+    log_path    = output_path.with_suffix('.jsonl')
     if output_path.exists():
         with open(output_path, encoding='utf-8') as f:
             results = json.load(f)
-        done_keys = {r['item_key'] for r in results}
-        print(f"\nResuming: {len(done_keys)} document(s) already done\n")
     else:
-        results, done_keys = [], set()
+        results = []
+    replayed = _replay_results_log(results, log_path)
+    if replayed:
+        save_results(results, output_path)
+        log_path.unlink()
+    done_keys = {r['item_key'] for r in results}
+    # Content hash → first result for that PDF, to skip duplicate attachments
+    by_digest = {}
+    for r in results:
+        if r.get('file_digest'):
+            by_digest.setdefault(r['file_digest'], r)
+    if done_keys:
+        print(f"\nResuming: {len(done_keys)} document(s) already done\n")
+
+    # Each result is appended to the log; the JSON is rewritten periodically
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    log     = open(log_path, 'a', encoding='utf-8')
+    pending = 0     # results logged since the last JSON checkpoint
+
+    def _log_result(record: dict):
+        nonlocal pending
+        results.append(record)
+        by_digest.setdefault(record['file_digest'], record)
+        _append_result(log, record)
+        pending += 1
+        if pending >= args.save_every:
+            save_results(results, output_path)
+            log.truncate(0)
+            pending = 0
+            print(f"\n  [saved → {output_path}]")
+        else:
+            print(f"\n  [logged → {log_path}]")
+
+    # Turn SIGTERM (e.g. a job scheduler stopping us) into SystemExit so the
+    # finally block below still writes the consolidated JSON
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(128 + signal.SIGTERM))
 
     # ── Document loop ─────────────────────────────────────────────────────────
     doc_id = 0   # monotonically increasing — used to discard stale Docling results
 
+    # Next document already queued on Docling/Vision: (key, doc_id, submitted_at).
+    # Submitting it right after the current doc's phase 1 lets Docling work on
+    # it while the current doc is in Tesseract.
+    prefetched = None
+
     try:
         for idx, (item, attachment_path) in enumerate(samples, 1):
             title = item.get('data', {}).get('title', 'Untitled')
@@ -540,20 +901,58 @@ def main():
                 print("  (already processed, skipping)")
                 continue
 
+            # Same PDF already extracted under another item (preprint vs
+            # published, duplicate attachments) — reuse it, no model calls
+            digest = _file_digest(attachment_path)
+            if digest in by_digest:
+                prev = by_digest[digest]
+                print(f"  Duplicate of {prev['item_key']} — reusing its extraction")
+                if prefetched and prefetched[0] == key:
+                    prefetched = None     # its stale results are discarded by doc_id
+                _log_result(_dedup_record(prev, key, title, attachment_path, texts_dir))
+                continue
+
             witnesses      = {}
             used_tesseract = False
 
             # ── Phase 1: Docling (persistent) + Vision in parallel ─────────────
+            if prefetched and prefetched[0] == key:
+                _, this_id, submitted_at = prefetched
+            else:
+                this_id, submitted_at = doc_id, None
+                doc_id += 1
+            prefetched = None
+
             phase1 = run_phase1_parallel(
                 attachment_path  = attachment_path,
                 n_pages          = args.vision_pages,
                 timeout          = args.timeout,
-                docling_task_q   = docling_task_q,
-                docling_result_q = docling_result_q,
-                doc_id           = doc_id,
-                vision_available = vision_available,
+                docling_worker   = docling_worker,
+                doc_id           = this_id,
+                vision_worker    = vision_worker,
+                submitted_at     = submitted_at,
+                skip_vision_conf = args.skip_vision_conf,
             )
-            doc_id += 1
+
+            if vision_worker is not None and not vision_worker[0].is_alive():
+                # Killed on a Vision timeout — respawn before queueing more work
+                _stop_worker(*vision_worker)
+                try:
+                    vision_worker = start_vision_worker()
+                except RuntimeError as e:
+                    print(f"⚠ {e}"); vision_worker = None; vision_available = False
+
+            # Queue the next pending document so Docling overlaps our Tesseract
+            nxt = next(((it, p) for it, p in samples[idx:]
+                        if it.get('key', 'unknown') not in done_keys
+                        and _file_digest(p) != digest and _file_digest(p) not in by_digest),
+                       None)
+            if nxt:
+                prefetched = (nxt[0].get('key', 'unknown'), doc_id,
+                              submit_phase1(nxt[1], args.vision_pages, docling_worker, doc_id,
+                                            None if args.skip_vision_conf is not None
+                                            else vision_worker))
+                doc_id += 1
 
             docling_result = phase1['docling']
             vision_result  = phase1.get('vision')
@@ -561,6 +960,8 @@ def main():
             for name, res in phase1.items():
                 if res.get('error'):
                     print(f"  {name.capitalize()}: ✗ {res['error']}")
+                elif res.get('metadata', {}).get('skipped'):
+                    print(f"  {name.capitalize()}: – skipped")
                 else:
                     pages_info = ''
                     if name == 'vision' and res.get('metadata', {}).get('pages_sampled'):
@@ -571,14 +972,23 @@ def main():
 
             # Language detection from Docling output
             docling_text  = docling_result.get('text') or ''
-            detected_lang = detect_and_format(docling_text) if docling_text else None
+            if args.assume_lang:
+                detected_lang = args.assume_lang
+            else:
+                detected_lang = detect_and_format(_lang_sample(docling_text)) if docling_text else None
             if detected_lang:
                 print(f"  [languages: {detected_lang}]")
 
             # ── Phase 2: Vision gate ───────────────────────────────────────────
             needs_tesseract = not vision_available
 
-            if vision_result and not vision_result.get('error') and docling_text:
+            vision_skipped = bool(vision_result and vision_result.get('metadata', {}).get('skipped'))
+            if vision_skipped:
+                print(f"  Vision gate: Docling confidence "
+                      f"{docling_result.get('confidence', 0.0):.2f} ≥ {args.skip_vision_conf} "
+                      f"→ Docling accepted ✓  (Vision + Tesseract skipped)")
+
+            elif vision_result and not vision_result.get('error') and docling_text:
                 gate_score = vision_gate_score(docling_result, vision_result)
                 witnesses['vision'] = vision_result
 
@@ -590,9 +1000,19 @@ def main():
                           f"→ running Tesseract...")
                     needs_tesseract = True
 
-            # ── Phase 3: Tesseract in a child PROCESS ─────────────────────────
+            # ── Phase 3: Tesseract in the persistent worker ───────────────────
             if needs_tesseract and tesseract_available:
-                tess_result = run_tesseract_in_process(attachment_path, detected_lang, args.timeout)
+                if not tess_worker[0].is_alive():
+                    # Killed on a previous timeout / memory abort — respawn
+                    _stop_worker(*tess_worker)
+                    try:
+                        tess_worker = start_tesseract_worker(workers=args.tess_workers)
+                    except RuntimeError as e:
+                        print(f"⚠ {e}"); tesseract_available = False
+            if needs_tesseract and tesseract_available:
+                tess_result = run_tesseract_in_process(
+                    attachment_path, detected_lang, args.timeout, tess_worker, this_id,
+                    mem_limit=args.mem_limit)
                 witnesses['tesseract'] = tess_result
                 used_tesseract = True
                 if tess_result.get('error'):
@@ -605,12 +1025,12 @@ def main():
             # For pairwise similarity, compare only the first VISION_PAGES pages
             # of Docling against Vision — comparing the full doc to 3 sampled
             # pages via Levenshtein always scores low due to length mismatch.
+            # compare_pages tells the quality module which page_texts to use.
             witnesses_for_quality = dict(witnesses)
             docling_page_texts = docling_result.get('page_texts', {})
             if docling_page_texts:
                 first_pages = sorted(docling_page_texts)[:args.vision_pages]
-                docling_excerpt = ' '.join(docling_page_texts[p] for p in first_pages)
-                witnesses_for_quality['docling'] = {**docling_result, 'text': docling_excerpt}
+                witnesses_for_quality['docling'] = {**docling_result, 'compare_pages': first_pages}
 
             quality = compute_quality_metrics(witnesses_for_quality)
 
@@ -634,18 +1054,16 @@ def main():
             for name, path in saved_paths.items():
                 print(f"    {name}: {path}")
 
-            # ── Append slim result to JSON ─────────────────────────────────────
-            results.append({
+            # ── Append slim result to the log (JSON rewritten periodically) ───
+            _log_result({
                 'item_key':       key,
                 'title':          title,
                 'file':           str(attachment_path),
+                'file_digest':    digest,
                 'witnesses':      witnesses_slim,
                 'quality':        quality,
                 'used_tesseract': used_tesseract,
             })
-
-            save_results(results, output_path)
-            print(f"\n  [saved → {output_path}]")
             notify(
                 f"{idx}/{len(samples)} done — {quality['recommendation'].upper()}"
                 + (" (+Tesseract)" if used_tesseract else ""),
@@ -653,11 +1071,16 @@ def main():
             )
 
     finally:
-        # Shut down the persistent Docling worker cleanly
-        docling_task_q.put(None)
-        docling_proc.join(timeout=5)
-        if docling_proc.is_alive():
-            docling_proc.terminate()
+        # Final consolidated JSON; the log is only needed until then
+        if pending:
+            save_results(results, output_path)
+        log.close()
+        log_path.unlink(missing_ok=True)
+
+        # Shut down the persistent workers cleanly
+        for worker in (docling_worker, vision_worker, tess_worker):
+            if worker is not None:
+                _stop_worker(*worker)
 
     # ── Summary ───────────────────────────────────────────────────────────────
     print("\n" + "="*60)
@@ -690,5 +1113,16 @@ def main():
 
 
 if __name__ == '__main__':
-    mp.set_start_method('spawn', force=True)   # safe on macOS; avoids fork+Objective-C crashes
+    if sys.platform.startswith('linux'):
+        # forkserver: workers fork from a clean server that has already
+        # imported the extractor libraries.  The server does not inherit our
+        # sys.path, so src/ goes on PYTHONPATH for the preload to resolve.
+        mp.set_start_method('forkserver', force=True)
+        _os.environ['PYTHONPATH'] = _os.pathsep.join(
+            filter(None, [_SRC, _os.environ.get('PYTHONPATH')]))
+        mp.set_forkserver_preload(['extractors.docling_extractor',
+                                   'extractors.vision_extractor',
+                                   'extractors.tesseract_extractor'])
+    else:
+        mp.set_start_method('spawn', force=True)   # safe on macOS; avoids fork+Objective-C crashes
     sys.exit(main())
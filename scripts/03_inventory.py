@@ -19,23 +19,33 @@ Usage:
     python scripts/03_inventory.py
     python scripts/03_inventory.py --output data/inventory.json
     python scripts/03_inventory.py --no-classify   # skip PDF classification (fast mode)
+    python scripts/03_inventory.py --workers 4     # parallel PDF classification
 """
+import os
 import sys
 import json
+import hashlib
 import re
 import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 
 # ── HTML helper (for Zotero note content) ─────────────────────────────────────
 
+# One pass: runs of whitespace, tags and non-breaking spaces collapse to a
+# single space; the remaining entities are decoded via _HTML_ENTITIES.
+_HTML_RE = re.compile(r'(?:\s|<[^>]+>|&nbsp;|&#160;)+|&(?:amp|lt|gt|quot|#39);')
+_HTML_ENTITIES = {'&amp;': '&', '&lt;': '<', '&gt;': '>', '&quot;': '"', '&#39;': "'"}
+
+
+def _html_repl(m: re.Match) -> str:
+    return _HTML_ENTITIES.get(m.group(0), ' ')
+
+
 def _strip_html(html: str) -> str:
     """Remove HTML tags and decode common entities from Zotero note HTML."""
-    text = re.sub(r'<[^>]+>', ' ', html or '')
-    for ent, ch in [('&amp;', '&'), ('&lt;', '<'), ('&gt;', '>'),
-                    ('&nbsp;', ' '), ('&#160;', ' '), ('&quot;', '"'), ('&#39;', "'")]:
-        text = text.replace(ent, ch)
-    return re.sub(r'\s+', ' ', text).strip()
+    return _HTML_RE.sub(_html_repl, html or '').strip()
 
 _ROOT = Path(__file__).parent.parent
 _SRC  = str(_ROOT / 'src')
@@ -55,7 +65,7 @@ except ImportError:
     _PDFIUM = False
 
 try:
-    from language_detector import detect_languages
+    from language_detector import detect_languages, detector_name, preload as preload_lang
     _LANG_DETECTOR = True
 except ImportError:
     _LANG_DETECTOR = False
@@ -69,6 +79,21 @@ _TESS_TO_ISO = {
 # Avg chars/page threshold below which we call a PDF "scanned"
 _SCANNED_THRESHOLD = 50
 
+# Characters of sampled text kept for language detection
+_LANG_SAMPLE_CHARS = 4000
+
+# Persistent {sha1(detector + sample_text)[:16]: language} cache — language
+# detection is deterministic on the sample and costs more than the PDFium
+# sampling.  The detector name is hashed in so switching backends re-detects.
+LANG_CACHE_PATH = _ROOT / 'data' / '.lang_cache.json'
+
+# Persistent {fingerprint: classify_pdf result} cache — unchanged files skip
+# PDFium entirely; a hit costs one stat() and a 4 KB read.
+CLASSIFY_CACHE_PATH = _ROOT / 'data' / '.classify_cache.json'
+
+# Per-process view of the cache; set in pool workers by _init_classify_worker
+_LANG_CACHE: dict = {}
+
 
 def _estimate_page_dpi(page) -> float | None:
     """Estimate effective DPI of images on a single PDF page.
@@ -119,6 +144,7 @@ def classify_pdf(path: Path) -> dict:
     if not _PDFIUM:
         return result
 
+    doc = None
     try:
         doc = pdfium.PdfDocument(str(path))
         n   = len(doc)
@@ -131,40 +157,67 @@ def classify_pdf(path: Path) -> dict:
         tail = list(range(max(0, n - 3), n))
         sample_indices = list(dict.fromkeys(head + tail))  # preserve order, no dups
 
-        texts       = []
-        total_chars = 0
-
-        for i in sample_indices:
-            page     = doc[i]
-            textpage = page.get_textpage()
-            text     = textpage.get_text_range()
-            total_chars += len(text)
-            texts.append(text)
-
-        # Use first-3 pages only for embedded/scanned classification
-        first_chars = sum(len(doc[i].get_textpage().get_text_range()) for i in head)
-        avg = first_chars / len(head) if head else 0
-        result['avg_chars_page'] = round(avg, 1)
-        result['doc_type'] = 'scanned' if avg < _SCANNED_THRESHOLD else 'embedded'
-
-        # Estimate DPI from images on the first few sampled pages
-        # Born-digital docs get DPI 0 — no raster resolution to measure
-        if result['doc_type'] == 'embedded':
-            result['pdf_dpi'] = 0
-        else:
-            all_dpis = []
-            for i in sample_indices[:3]:
-                d = _estimate_page_dpi(doc[i])
-                if d is not None:
-                    all_dpis.append(d)
-            if all_dpis:
-                all_dpis.sort()
-                result['pdf_dpi'] = round(all_dpis[len(all_dpis) // 2])
-
-        sample_text = ' '.join(texts)[:4000]
+        # One pass over the sampled pages.  Text is extracted only until the
+        # joined sample fills the language-detection budget (anything later
+        # would be truncated away); head pages past the budget just get a
+        # character count from PDFium's text index for classification.  Head
+        # pages stay open so DPI estimation (scanned docs) can reuse them.
+        page_texts = {}
+        page_chars = {}
+        head_pages = {}
+        joined_len = -1   # length of ' '.join(texts so far)
+        try:
+            for i in sample_indices:
+                if joined_len >= _LANG_SAMPLE_CHARS and i not in head:
+                    continue
+                page     = doc[i]
+                textpage = page.get_textpage()
+                try:
+                    if joined_len < _LANG_SAMPLE_CHARS:
+                        page_texts[i] = textpage.get_text_range()
+                        page_chars[i] = len(page_texts[i])
+                        joined_len   += len(page_texts[i]) + 1
+                    else:
+                        page_chars[i] = max(0, textpage.count_chars())
+                finally:
+                    textpage.close()
+                    if i in head:
+                        head_pages[i] = page
+                    else:
+                        page.close()
+
+            # Use first-3 pages only for embedded/scanned classification
+            first_chars = sum(page_chars[i] for i in head)
+            avg = first_chars / len(head) if head else 0
+            result['avg_chars_page'] = round(avg, 1)
+            result['doc_type'] = 'scanned' if avg < _SCANNED_THRESHOLD else 'embedded'
+
+            # Estimate DPI from images on the first few sampled pages
+            # Born-digital docs get DPI 0 — no raster resolution to measure
+            if result['doc_type'] == 'embedded':
+                result['pdf_dpi'] = 0
+            else:
+                all_dpis = []
+                for i in head:
+                    d = _estimate_page_dpi(head_pages[i])
+                    if d is not None:
+                        all_dpis.append(d)
+                if all_dpis:
+                    all_dpis.sort()
+                    result['pdf_dpi'] = round(all_dpis[len(all_dpis) // 2])
+        finally:
+            for page in head_pages.values():
+                page.close()
+        texts = [page_texts[i] for i in sample_indices if i in page_texts]
+
+        sample_text = ' '.join(texts)[:_LANG_SAMPLE_CHARS]
         result['lang_sample'] = sample_text[:200].strip()
 
-        if _LANG_DETECTOR and sample_text.strip():
+        detector  = detector_name() if _LANG_DETECTOR else 'none'
+        lang_hash = hashlib.sha1(f"{detector}\0{sample_text}".encode('utf-8')).hexdigest()[:16]
+        if sample_text.strip() and lang_hash in _LANG_CACHE:
+            result['language'] = _LANG_CACHE[lang_hash]
+        elif _LANG_DETECTOR and sample_text.strip():
             try:
                 tess_codes = detect_languages(sample_text)
                 iso_codes = sorted(set(
@@ -174,23 +227,150 @@ def classify_pdf(path: Path) -> dict:
                     result['language'] = iso_codes[0]
                 elif iso_codes:
                     result['language'] = iso_codes
+                result['lang_hash'] = lang_hash   # new entry for the cache
             except Exception:
                 result['language'] = 'unknown'
 
     except Exception as e:
         result['doc_type'] = 'error'
         result['error']    = str(e)[:120]
+    finally:
+        # Release PDFium's document state and file handle now, not at GC
+        if doc is not None:
+            doc.close()
 
     return result
 
 
+def _classification_fields(pdf_info: dict) -> dict:
+    """Inventory fields derived from a classify_pdf() result."""
+    return {
+        'doc_type':    pdf_info.get('doc_type', 'unknown'),
+        'page_count':  pdf_info.get('page_count'),
+        'avg_chars_pg': pdf_info.get('avg_chars_page'),
+        'pdf_dpi':     pdf_info.get('pdf_dpi'),
+        'language':    pdf_info.get('language'),
+    }
+
+
+def _pdf_fingerprint(path: Path, detector: str) -> str:
+    """Cheap change detector: size, mtime and a hash of the first 4 KB."""
+    st = path.stat()
+    with open(path, 'rb') as f:
+        head = hashlib.sha1(f.read(4096)).hexdigest()[:16]
+    return f"{st.st_size}:{int(st.st_mtime)}:{head}:{detector}"
+
+
+def _load_cache(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except Exception:
+        return {}
+
+
+def _save_cache(cache: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.tmp.json')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False)
+    tmp.replace(path)
+
+
+def _init_classify_worker(lang_cache: dict) -> None:
+    """Pool initializer: runs once per worker, before its first PDF."""
+    global _LANG_CACHE
+    _LANG_CACHE = lang_cache
+    # Load fastText / langdetect profiles up front, once per worker (a no-op
+    # when a forked worker inherited them from the parent)
+    if _LANG_DETECTOR:
+        preload_lang()
+
+
+def classify_pdfs(paths: dict, workers: int, lang_cache: dict | None = None,
+                  classify_cache: dict | None = None) -> dict:
+    """
+    Run classify_pdf over {key: path} in a process pool.
+
+    Classification is CPU-bound PDFium work on independent files, so it
+    scales with cores.  lang_cache is shipped to each worker once and
+    updated in place with newly detected languages.  classify_cache maps
+    file fingerprints to earlier results; hits skip the pool, and on return
+    it holds exactly this run's files.
+    Returns {key: classify_pdf result}.
+    """
+    results = {}
+    if lang_cache is None:
+        lang_cache = {}
+    if classify_cache is None:
+        classify_cache = {}
+
+    detector = detector_name() if _LANG_DETECTOR else 'none'
+    previous = dict(classify_cache)
+    classify_cache.clear()
+    fingerprints = {}
+    misses = {}
+    for key, path in paths.items():
+        try:
+            fp = _pdf_fingerprint(path, detector)
+        except OSError:
+            misses[key] = path
+            continue
+        fingerprints[key] = fp
+        if fp in previous:
+            results[key] = previous[fp]
+            classify_cache[fp] = previous[fp]
+        else:
+            misses[key] = path
+    if results:
+        print(f"Classification cache: {len(results)} unchanged PDF(s) reused")
+    paths = misses
+    if not paths:
+        return results
+    workers = max(1, min(workers, len(paths)))
+    print(f"Classifying {len(paths)} PDFs with {workers} worker(s)...")
+    done = 0
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_classify_worker,
+                             initargs=(lang_cache,)) as ex:
+        futures = {ex.submit(classify_pdf, path): key for key, path in paths.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            done += 1
+            try:
+                results[key] = future.result()
+                if 'lang_hash' in results[key]:
+                    lang_cache[results[key]['lang_hash']] = results[key]['language']
+                if key in fingerprints and 'error' not in results[key]:
+                    classify_cache[fingerprints[key]] = results[key]
+            except Exception as e:
+                results[key] = {'doc_type': 'error', 'error': str(e)[:120]}
+            print(f"\r  [{done:3d}/{len(paths)}] classified", end="", flush=True)
+    print()
+    return results
+
+
 # ── Attachment status via API ─────────────────────────────────────────────────
 
+def scan_staged_keys(pdfs_dir: Path = _ROOT / 'data' / 'pdfs') -> set[str]:
+    """Keys with a staged data/pdfs/{key}.pdf — one directory read, not a stat per item."""
+    try:
+        with os.scandir(pdfs_dir) as entries:
+            return {e.name[:-4] for e in entries if e.name.endswith('.pdf') and e.is_file()}
+    except FileNotFoundError:
+        return set()
+
+
 def get_attachment_status(library: ZoteroLibrary, item: dict,
-                          children: list | None = None) -> dict:
+                          children: list | None = None,
+                          staged_keys: set[str] | None = None) -> dict:
     """
     Check attachment availability via the Zotero web API.
 
+    staged_keys (from scan_staged_keys) avoids a stat() per item; without it
+    data/pdfs/{key}.pdf is checked directly.
+
     Returns:
       { 'status': 'has_attachment'|'url_only'|'no_attachment',
         'attachment_key': str|None,
@@ -214,10 +394,12 @@ def get_attachment_status(library: ZoteroLibrary, item: dict,
     if att_info:
         # Check if already fetched to data/pdfs/
         staged_path = _ROOT / 'data' / 'pdfs' / f"{item.get('key', '')}.pdf"
-        status = 'stored' if staged_path.exists() else 'has_attachment'
+        staged = (item.get('key', '') in staged_keys if staged_keys is not None
+                  else staged_path.exists())
+        status = 'stored' if staged else 'has_attachment'
         return {
             'status': status,
-            'pdf_path': str(staged_path.relative_to(_ROOT)) if staged_path.exists() else None,
+            'pdf_path': str(staged_path.relative_to(_ROOT)) if staged else None,
             'attachment_key': att_info['key'],
             'filename': att_info['filename'],
             'url': item_url or None,
@@ -263,7 +445,8 @@ def load_extraction_results(path: Path) -> dict:
 
 # ── Main inventory loop ────────────────────────────────────────────────────────
 
-def build_inventory(classify: bool = True) -> list:
+def build_inventory(classify: bool = True,
+                    workers: int = min(os.cpu_count() or 1, 8)) -> list:
     library = ZoteroLibrary()
     print(f"Fetching items from Zotero web API ({library.library_type} library, "
           f"ID {library.library_id})...")
@@ -275,8 +458,10 @@ def build_inventory(classify: bool = True) -> list:
 
     extraction = load_extraction_results(_ROOT / 'data' / 'test_results.json')
     downloads  = load_download_results(_ROOT / 'data' / 'download_results.json')
+    staged     = scan_staged_keys()
 
     inventory = []
+    to_classify = {}   # key -> absolute PDF path, classified after the metadata pass
     n = len(items)
 
     for idx, item in enumerate(items, 1):
@@ -318,7 +503,7 @@ def build_inventory(classify: bool = True) -> list:
         print(f"\r  [{idx:3d}/{n}] {title[:55]:<55}", end="", flush=True)
 
         children = children_by_parent.get(key, [])
-        att = get_attachment_status(library, item, children=children)
+        att = get_attachment_status(library, item, children=children, staged_keys=staged)
         pdf_path = att['pdf_path']
 
         # Fall back to locally downloaded file if it exists
@@ -328,10 +513,9 @@ def build_inventory(classify: bool = True) -> list:
                 pdf_path = dl_path
                 att['status'] = 'downloaded'
 
-        pdf_info = {}
         if classify and pdf_path and att['status'] in ('stored', 'downloaded'):
-            pdf_info = classify_pdf(Path(pdf_path) if Path(pdf_path).is_absolute()
-                                    else _ROOT / pdf_path)
+            to_classify[key] = (Path(pdf_path) if Path(pdf_path).is_absolute()
+                                else _ROOT / pdf_path)
 
         ext = extraction.get(key, {})
         quality  = ext.get('quality', {})
@@ -353,12 +537,8 @@ def build_inventory(classify: bool = True) -> list:
             # Attachment
             'pdf_status':  att['status'],
             'pdf_path':    pdf_path,
-            # Classification
-            'doc_type':    pdf_info.get('doc_type', 'unknown' if not pdf_path else 'unknown'),
-            'page_count':  pdf_info.get('page_count'),
-            'avg_chars_pg': pdf_info.get('avg_chars_page'),
-            'pdf_dpi':     pdf_info.get('pdf_dpi'),
-            'language':    pdf_info.get('language'),
+            # Classification (filled in below once the pool has run)
+            **_classification_fields({}),
             # Extraction
             'extracted':   bool(ext),
             'quality_score': round(score, 2) if score is not None else None,
@@ -370,6 +550,19 @@ def build_inventory(classify: bool = True) -> list:
         inventory.append(entry)
 
     print(f"\r  Done — {n} items inventoried.{' '*30}")
+
+    lang_cache     = _load_cache(LANG_CACHE_PATH) if to_classify else {}
+    classify_cache = _load_cache(CLASSIFY_CACHE_PATH) if to_classify else {}
+    cached         = len(lang_cache)
+    pdf_infos      = classify_pdfs(to_classify, workers, lang_cache, classify_cache)
+    if len(lang_cache) != cached:
+        _save_cache(lang_cache, LANG_CACHE_PATH)
+    if to_classify:
+        _save_cache(classify_cache, CLASSIFY_CACHE_PATH)
+    for entry in inventory:
+        if entry['key'] in pdf_infos:
+            entry.update(_classification_fields(pdf_infos[entry['key']]))
+
     return inventory
 
 
@@ -382,6 +575,8 @@ def main():
     parser.add_argument('--output',      default='data/inventory.json')
     parser.add_argument('--no-classify', action='store_true',
                         help='Skip PDF classification (fast mode — no doc_type/language)')
+    parser.add_argument('--workers', type=int, default=min(os.cpu_count() or 1, 8),
+                        help='Parallel processes for PDF classification (default: min(cpus, 8))')
     args = parser.parse_args()
 
     inv_path  = _ROOT / args.output
@@ -391,7 +586,7 @@ def main():
         print("pypdfium2 not available — running in fast mode (no PDF classification)")
         classify = False
 
-    inventory = build_inventory(classify=classify)
+    inventory = build_inventory(classify=classify, workers=args.workers)
 
     # Save JSON
     inv_path.parent.mkdir(parents=True, exist_ok=True)
@@ -10,20 +10,27 @@ Strategy (in order):
 
 Skips known paywall domains to avoid wasting time.
 Saves PDFs to data/pdfs/{item_key}/{sanitised_filename}.pdf
-Results logged to data/download_results.json (resume-safe).
+Results logged to data/download_results.json (resume-safe): each result is
+appended to data/download_results.jsonl as it completes, the JSON is rewritten
+every SAVE_EVERY items and at exit, and a log left by an interrupted run is
+merged on the next start.  URLs that already failed for good (paywall,
+not_pdf, ...) are skipped for new items citing them too.
 
 Usage:
     python scripts/04_download_pdfs.py
     python scripts/04_download_pdfs.py --dry-run       # print plan, no downloads
     python scripts/04_download_pdfs.py --limit 20      # stop after N downloads
-    python scripts/04_download_pdfs.py --delay 2.0     # seconds between requests
+    python scripts/04_download_pdfs.py --delay 2.0     # seconds between requests to a host
+    python scripts/04_download_pdfs.py --retry-failed  # retry paywall/not_pdf/... results
+    python scripts/04_download_pdfs.py --refresh       # re-fetch PDFs that changed upstream
+    python scripts/04_download_pdfs.py --workers 4     # hosts fetched concurrently
 """
 import sys
 import re
-import time
-import json
 import argparse
 import mimetypes
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from urllib.parse import urlparse, urljoin, unquote
 
@@ -41,81 +48,298 @@ except ImportError:
     print("ERROR: requests not installed. Run: pip install requests")
     sys.exit(1)
 
+from json_io import dumps, loads
 from pdf_finder import (
     HEADERS, PAYWALL_DOMAINS, HTML_DOMAINS, ARCHIVE_API, DOI_RESOLVER,
-    make_session, safe_filename, is_pdf_response, save_pdf, host,
+    make_session, safe_filename, is_pdf_response, looks_like_pdf_url, host,
+    classify_host,
     resolve_archive_org, resolve_doi,
 )
 
 
+# doi.org redirects are resolved up front, this many at a time
+DOI_HOSTS           = ('doi.org', 'dx.doi.org')
+DOI_RESOLVE_WORKERS = 20
+
+# Per-host back-off: a host whose requests exhaust their retries (429/5xx)
+# gets its delay doubled, up to MAX_HOST_DELAY; after RECOVER_AFTER clean
+# requests in a row it is halved again, down to --delay
+MAX_HOST_DELAY = 60.0
+RECOVER_AFTER  = 5
+
+# Outcomes that won't change on a retry (unlike 'error' / 'http_*')
+FAILED_STATUSES = ('paywall', 'not_pdf', 'borrow_required', 'not_found')
+
+# Rewrite download_results.json after this many items; in between, each
+# result is only appended to the .jsonl log
+SAVE_EVERY = 25
+
+
 # ── Core download logic ────────────────────────────────────────────────────────
 
-def try_download(url: str, session: requests.Session) -> dict:
+# Streaming chunk size — peak memory per download is one chunk, not the file
+_CHUNK = 1 << 20
+# Bytes read before deciding whether an untyped response is a PDF, so an
+# HTML landing page is dropped after one small read rather than a full chunk
+_PEEK  = 1024
+
+
+def pdf_dest(out_dir: Path, key: str, title: str, download_url: str) -> Path:
+    """data/pdfs/{key}/{sanitised filename}.pdf — from the URL, else the title."""
+    raw_name = Path(urlparse(download_url).path).name
+    fname    = safe_filename(raw_name)
+    if not fname.lower().endswith('.pdf'):
+        fname = safe_filename(title) + '.pdf'
+    if not fname.endswith('.pdf'):
+        fname += '.pdf'
+    return out_dir / key / fname
+
+
+def _looks_direct(url: str) -> bool:
     """
-    Attempt to download a PDF from `url`.
-    Returns {'status': ..., 'download_url': ..., 'content': bytes|None, 'bytes': int}
+    URLs that are almost certainly the PDF itself (a .pdf path, or an
+    archive.org download link).  A HEAD would tell us nothing the GET's
+    status code, Content-Type and magic bytes don't, so skip the round-trip.
+    """
+    return urlparse(url).path.lower().endswith('.pdf') or host(url) == 'archive.org'
+
+
+def _error_result(url: str, e: Exception) -> dict:
+    result = {'status': 'error', 'download_url': url,
+              'pdf_path': None, 'bytes': 0, 'error': str(e)[:120]}
+    if isinstance(e, requests.exceptions.RetryError):
+        result['throttled'] = True   # urllib3 gave up on repeated 429/5xx
+    return result
+
+
+# archive.org identifier → download URL, for items (e.g. chapters of one
+# volume) that point at the same record.  Only hits are kept: a None from
+# resolve_archive_org may be a transient API error, not a borrow-only item.
+_ARCHIVE_URLS: dict[str, str] = {}
+
+
+def _resolve_archive_cached(url: str, session: requests.Session) -> str | None:
+    m = re.search(r'archive\.org/details/([^/?#]+)', url)
+    ident = m.group(1) if m else url
+    if ident not in _ARCHIVE_URLS:
+        dl_url = resolve_archive_org(url, session)
+        if not dl_url:
+            return None
+        _ARCHIVE_URLS[ident] = dl_url
+    return _ARCHIVE_URLS[ident]
+
+
+def try_download(url: str, session: requests.Session,
+                 out_dir: Path, key: str, title: str,
+                 validators: dict | None = None) -> dict:
+    """
+    Attempt to download a PDF from `url`, streaming it straight to
+    pdf_dest(out_dir, key, title, final_url).
+    validators, if given, are the 'etag' / 'last_modified' of an earlier
+    download: the GET is made conditional and a 304 returns 'unchanged': True.
+    Returns {'status': ..., 'download_url': ..., 'pdf_path': str|None, 'bytes': int}
+    plus 'etag' / 'last_modified' on success and 'throttled': True when the
+    host kept answering 429/5xx.
     """
     h = host(url)
 
     # Paywall domains — skip immediately
-    if any(h == d or h.endswith('.' + d) for d in PAYWALL_DOMAINS):
-        return {'status': 'paywall', 'download_url': url, 'content': None, 'bytes': 0}
+    if classify_host(h) == 'paywall':
+        return {'status': 'paywall', 'download_url': url, 'pdf_path': None, 'bytes': 0}
 
     # archive.org/details — resolve via API
     if 'archive.org/details/' in url:
-        dl_url = resolve_archive_org(url, session)
+        dl_url = _resolve_archive_cached(url, session)
         if not dl_url:
             return {'status': 'borrow_required', 'download_url': url,
-                    'content': None, 'bytes': 0}
+                    'pdf_path': None, 'bytes': 0}
         url = dl_url
 
-    # Try HEAD first to check Content-Type without downloading body.
+    # Try HEAD first to check Content-Type without downloading body — except
+    # for direct PDF links, where the GET below performs the same checks.
     # Some servers return 405 (Method Not Allowed) for HEAD — fall through to GET.
     final_url = url
     head_ok = False
+    cond    = {}
+    if validators:
+        if validators.get('etag'):
+            cond['If-None-Match'] = validators['etag']
+        if validators.get('last_modified'):
+            cond['If-Modified-Since'] = validators['last_modified']
+    if not cond and not _looks_direct(url):
+        try:
+            head = session.head(url, allow_redirects=True, timeout=20)
+            final_url = head.url
+            if head.status_code == 403:
+                return {'status': 'paywall', 'download_url': final_url, 'pdf_path': None, 'bytes': 0}
+            if head.status_code == 404:
+                return {'status': 'not_found', 'download_url': final_url, 'pdf_path': None, 'bytes': 0}
+            if head.status_code in (200, 206):
+                head_ok = True
+                if is_pdf_response(head):
+                    pass  # confirmed PDF — fall through to download
+                else:
+                    # Non-PDF content-type on HEAD; check URL pattern before attempting GET
+                    if not (looks_like_pdf_url(final_url) or
+                            (final_url != url and looks_like_pdf_url(url))):
+                        return {'status': 'not_pdf', 'download_url': final_url,
+                                'pdf_path': None, 'bytes': 0}
+            # For 405 or other non-fatal codes, fall through and try GET directly
+        except Exception as e:
+            return _error_result(url, e)
+
+    # Actually download the PDF, chunk by chunk, into a .part file that is
+    # renamed into place once complete.  The context manager releases the
+    # streamed connection back to the session's pool even when we bail out
+    # early, so the next request to this host skips a new TLS handshake.
+    part = None
     try:
-        head = session.head(url, allow_redirects=True, timeout=20)
-        final_url = head.url
-        if head.status_code == 403:
-            return {'status': 'paywall', 'download_url': final_url, 'content': None, 'bytes': 0}
-        if head.status_code == 404:
-            return {'status': 'not_found', 'download_url': final_url, 'content': None, 'bytes': 0}
-        if head.status_code in (200, 206):
-            head_ok = True
-            if is_pdf_response(head):
-                pass  # confirmed PDF — fall through to download
-            else:
-                # Non-PDF content-type on HEAD; check URL pattern before attempting GET
-                url_looks_like_pdf = (
-                    final_url.lower().endswith('.pdf') or '/pdf' in final_url.lower() or
-                    url.lower().endswith('.pdf') or '/pdf' in url.lower()
-                )
-                if not url_looks_like_pdf:
-                    return {'status': 'not_pdf', 'download_url': final_url,
-                            'content': None, 'bytes': 0}
-        # For 405 or other non-fatal codes, fall through and try GET directly
-    except Exception as e:
-        return {'status': 'error', 'download_url': url,
-                'content': None, 'bytes': 0, 'error': str(e)[:120]}
-
-    # Actually download the PDF
-    try:
-        get = session.get(final_url, stream=True, timeout=60)
-        get.raise_for_status()
-        if not is_pdf_response(get):
-            # One more check — peek at magic bytes
-            chunk = next(get.iter_content(8), b'')
-            if not chunk.startswith(b'%PDF'):
+        with session.get(final_url, headers=cond, stream=True, timeout=60) as get:
+            final_url = get.url
+            if get.status_code == 304:
+                return {'status': 'ok', 'download_url': final_url, 'pdf_path': None,
+                        'bytes': 0, 'unchanged': True}
+            if get.status_code == 403:
+                return {'status': 'paywall', 'download_url': final_url, 'pdf_path': None, 'bytes': 0}
+            if get.status_code == 404:
+                return {'status': 'not_found', 'download_url': final_url, 'pdf_path': None, 'bytes': 0}
+            get.raise_for_status()
+            first = get.raw.read(_PEEK, decode_content=True) or b''
+            # Untyped response — the magic bytes must say PDF
+            if not is_pdf_response(get) and not first.startswith(b'%PDF'):
                 return {'status': 'not_pdf', 'download_url': final_url,
-                        'content': None, 'bytes': 0}
-            content = chunk + get.content
-        else:
-            content = get.content
+                        'pdf_path': None, 'bytes': 0}
+            if not first:
+                return {'status': 'ok', 'download_url': final_url,
+                        'pdf_path': None, 'bytes': 0}
+            dest = pdf_dest(out_dir, key, title, final_url)
+            part = dest.with_name(dest.name + '.part')
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            n_bytes = len(first)
+            with open(part, 'wb') as f:
+                f.write(first)
+                for chunk in get.iter_content(_CHUNK):
+                    f.write(chunk)
+                    n_bytes += len(chunk)
+        part.replace(dest)
         return {'status': 'ok', 'download_url': final_url,
-                'content': content, 'bytes': len(content)}
+                'pdf_path': str(dest), 'bytes': n_bytes,
+                'etag': get.headers.get('ETag'),
+                'last_modified': get.headers.get('Last-Modified')}
     except Exception as e:
-        return {'status': 'error', 'download_url': final_url,
-                'content': None, 'bytes': 0, 'error': str(e)[:120]}
+        if part is not None:
+            part.unlink(missing_ok=True)
+        return _error_result(final_url, e)
+
+
+def resolve_dois(urls: list) -> dict:
+    """
+    Resolve doi.org URLs concurrently (redirect-following only, no download).
+    Returns {doi_url: final_url} for those that resolved.
+    """
+    local = threading.local()
+
+    def _resolve(url: str) -> str | None:
+        if not hasattr(local, 'session'):
+            local.session = make_session()
+        return resolve_doi(urlparse(url).path.lstrip('/'), local.session)
+
+    with ThreadPoolExecutor(max_workers=min(DOI_RESOLVE_WORKERS, len(urls))) as ex:
+        return {url: final for url, final in zip(urls, ex.map(_resolve, urls)) if final}
+
+
+def download_item(item: dict, session: requests.Session, out_dir: Path,
+                  resolved_url: str | None = None,
+                  previous: dict | None = None) -> tuple[dict, str, bool]:
+    """
+    Run try_download for one inventory item and save the PDF if found.
+    resolved_url, if given, is where item['url'] redirects to (see resolve_dois).
+    previous, if given, is the item's earlier 'ok' result to revalidate
+    (--refresh); it is returned as-is when the server answers 304 or the
+    refresh fails.
+    Returns (results entry, one-line outcome for the progress log,
+             whether the host was throttling us).
+    """
+    key   = item['key']
+    title = item['title'][:60]
+    url   = item['url']
+
+    if previous:
+        result = try_download(previous['download_url'], session, out_dir, key, title,
+                              validators=previous)
+        if result.get('unchanged'):
+            return previous, '✓ Unchanged (304)', False
+        if result['status'] != 'ok':
+            return previous, f"⚠ refresh failed ({result['status']}), keeping existing PDF", \
+                result.get('throttled', False)
+    else:
+        result = try_download(resolved_url or url, session, out_dir, key, title)
+    status = result['status']
+
+    entry = {
+        'key':          key,
+        'title':        title,
+        'source_url':   url,
+        'download_url': result.get('download_url', url),
+        'status':       status,
+        'bytes':        result.get('bytes', 0),
+        'pdf_path':     result.get('pdf_path'),
+        'error':        result.get('error'),
+        'etag':         result.get('etag'),
+        'last_modified': result.get('last_modified'),
+    }
+
+    if status == 'ok' and result.get('pdf_path'):
+        dest    = Path(result['pdf_path'])
+        outcome = f"✓ Downloaded → {dest.name} ({result['bytes']//1024}KB)"
+    else:
+        icon = {'paywall': '🔒', 'not_pdf': '📄', 'borrow_required': '📚',
+                'not_found': '❌', 'error': '⚠'}.get(status, '–')
+        outcome = f"{icon} {status}" + (f": {result.get('error','')}" if result.get('error') else '')
+
+    return entry, outcome, result.get('throttled', False)
+
+
+# ── Results persistence ────────────────────────────────────────────────────────
+
+def save_results(results: list, res_path: Path) -> None:
+    res_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = res_path.with_suffix('.tmp.json')
+    tmp.write_bytes(dumps(results))
+    tmp.replace(res_path)
+
+
+def _append_result(log, entry: dict) -> None:
+    """Append one result to the JSONL log — O(1) per item."""
+    log.write(dumps(entry, indent=False) + b'\n')
+    log.flush()
+
+
+def _replay_results_log(results: list, log_path: Path) -> int:
+    """
+    Merge results left in the log by an interrupted run into ``results``.
+    The log only holds entries newer than the JSON, so they replace any
+    existing entry for the same key.  Returns the number replayed.
+    """
+    try:
+        f = open(log_path, 'rb')
+    except FileNotFoundError:
+        return 0
+    index    = {r['key']: i for i, r in enumerate(results)}
+    replayed = 0
+    with f:
+        for line in f:
+            try:
+                entry = loads(line)
+            except ValueError:
+                continue     # torn final line from a crash
+            if entry.get('key') in index:
+                results[index[entry['key']]] = entry
+            else:
+                index[entry['key']] = len(results)
+                results.append(entry)
+            replayed += 1
+    return replayed
 
 
 # ── Main ───────────────────────────────────────────────────────────────────────
@@ -127,7 +351,15 @@ def main():
     parser.add_argument('--limit',   type=int, default=0,
                         help='Stop after N successful downloads (0 = unlimited)')
     parser.add_argument('--delay',   type=float, default=1.5,
-                        help='Seconds to wait between requests (default 1.5)')
+                        help='Seconds to wait between requests to the same host (default 1.5)')
+    parser.add_argument('--workers', type=int, default=8,
+                        help='Hosts to download from concurrently (default 8)')
+    parser.add_argument('--retry-failed', action='store_true',
+                        help='Retry items that previously failed (paywall, not_pdf, '
+                             'borrow_required, not_found) instead of skipping them')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Revalidate earlier downloads with a conditional GET '
+                             '(ETag / Last-Modified) and re-fetch those that changed')
     parser.add_argument('--inventory', default='data/inventory.json')
     parser.add_argument('--results',   default='data/download_results.json')
     parser.add_argument('--out-dir',   default='data/pdfs')
@@ -138,17 +370,29 @@ def main():
     out_dir     = _ROOT / args.out_dir
 
     # Load inventory
-    with open(inv_path, encoding='utf-8') as f:
-        inventory = json.load(f)
+    inventory = loads(inv_path.read_bytes())
 
-    # Load existing results (resume)
+    # Load existing results (+ any log left by an interrupted run)
+    log_path = res_path.with_suffix('.jsonl')
     if res_path.exists():
-        with open(res_path, encoding='utf-8') as f:
-            results = json.load(f)
-        done_keys = {r['key'] for r in results}
-        print(f"Resuming: {len(done_keys)} item(s) already processed\n")
+        results = loads(res_path.read_bytes())
     else:
-        results, done_keys = [], set()
+        results = []
+    if _replay_results_log(results, log_path):
+        save_results(results, res_path)
+        log_path.unlink()
+    if args.retry_failed:
+        results = [r for r in results if r.get('status') not in FAILED_STATUSES]
+    done_keys = {r['key'] for r in results}
+    # URLs that already failed under another key — new items often cite a
+    # source we've seen (chapters of one paywalled volume, etc.)
+    failed_urls = {r['source_url'] for r in results
+                   if r.get('status') in FAILED_STATUSES}
+    # --refresh: earlier downloads to revalidate, by position in results
+    refresh = {r['key']: i for i, r in enumerate(results)
+               if args.refresh and r.get('status') == 'ok' and r.get('pdf_path')}
+    if done_keys:
+        print(f"Resuming: {len(done_keys)} item(s) already processed\n")
 
     # Candidates: URL-only items with a URL
     candidates = [
@@ -157,79 +401,140 @@ def main():
         and r.get('url')
         and r['key'] not in done_keys
     ]
+    n_before   = len(candidates)
+    candidates = [r for r in candidates if r['url'] not in failed_urls]
+    if len(candidates) < n_before:
+        print(f"Skipping {n_before - len(candidates)} item(s) whose URL already failed "
+              f"(--retry-failed to retry)")
+    candidates += [{'key': results[i]['key'], 'title': results[i]['title'],
+                    'url': results[i]['source_url']} for i in refresh.values()]
     # Also include DOI-resolvable items not yet processed
     print(f"Candidates: {len(candidates)} items to attempt")
     print(f"Dry run: {'YES' if args.dry_run else 'no'}\n")
 
-    session     = make_session()
     downloaded  = 0
     counts      = {}
 
-    for idx, item in enumerate(candidates, 1):
-        key   = item['key']
-        title = item['title'][:60]
-        url   = item['url']
-
-        print(f"[{idx:3d}/{len(candidates)}] {title}")
-        print(f"          {url[:80]}")
-
-        if args.dry_run:
+    if args.dry_run:
+        for idx, item in enumerate(candidates, 1):
+            url = item['url']
+            print(f"[{idx:3d}/{len(candidates)}] {item['title'][:60]}")
+            print(f"          {url[:80]}")
             h = host(url)
-            is_paywall = any(h == d or h.endswith('.' + d) for d in PAYWALL_DOMAINS)
+            host_kind  = classify_host(h)
+            is_paywall = host_kind == 'paywall'
             is_archive = 'archive.org/details/' in url
-            is_direct  = url.lower().endswith('.pdf')
-            tag = 'PAYWALL' if is_paywall else ('ARCHIVE' if is_archive else ('DIRECT-PDF' if is_direct else 'UNKNOWN'))
+            is_direct  = looks_like_pdf_url(url)
+            is_html    = host_kind == 'html'
+            tag = ('PAYWALL' if is_paywall else 'ARCHIVE' if is_archive else
+                   'DIRECT-PDF' if is_direct else 'HTML' if is_html else 'UNKNOWN')
             print(f"          → [{tag}]")
             print()
-            continue
-
-        result = try_download(url, session)
-        status = result['status']
-        counts[status] = counts.get(status, 0) + 1
-
-        entry = {
-            'key':          key,
-            'title':        title,
-            'source_url':   url,
-            'download_url': result.get('download_url', url),
-            'status':       status,
-            'bytes':        result.get('bytes', 0),
-            'pdf_path':     None,
-            'error':        result.get('error'),
-        }
-
-        if status == 'ok' and result.get('content'):
-            # Derive filename from URL, always sanitise + truncate
-            raw_name = Path(urlparse(result['download_url']).path).name
-            fname    = safe_filename(raw_name)
-            if not fname.lower().endswith('.pdf'):
-                fname = safe_filename(title) + '.pdf'
-            if not fname.endswith('.pdf'):
-                fname += '.pdf'
-            dest = out_dir / key / fname
-            save_pdf(result['content'], dest)
-            entry['pdf_path'] = str(dest)
-            downloaded += 1
-            print(f"          ✓ Downloaded → {dest.name} ({result['bytes']//1024}KB)")
-        else:
-            icon = {'paywall': '🔒', 'not_pdf': '📄', 'borrow_required': '📚',
-                    'not_found': '❌', 'error': '⚠'}.get(status, '–')
-            print(f"          {icon} {status}" + (f": {result.get('error','')}" if result.get('error') else ''))
-
-        results.append(entry)
-        done_keys.add(key)
-
-        # Save incrementally
-        res_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(res_path, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
 
-        if args.limit and downloaded >= args.limit:
-            print(f"\nReached download limit ({args.limit}), stopping.")
-            break
+    # One worker per host: requests to different hosts overlap, while the
+    # politeness delay still applies between consecutive requests to a host.
+    # DOIs are grouped by the host they resolve to, not doi.org.
+    by_host: dict[str, list] = {}
+    resolved = {}
+    if not args.dry_run:
+        doi_urls = list(dict.fromkeys(
+            item['url'] for item in candidates
+            if host(item['url']) in DOI_HOSTS and item['key'] not in refresh
+        ))
+        if doi_urls:
+            print(f"Resolving {len(doi_urls)} DOI(s)...\n")
+            resolved = resolve_dois(doi_urls)
+        for item in candidates:
+            if item['key'] in refresh:
+                target = results[refresh[item['key']]]['download_url']
+            else:
+                target = resolved.get(item['url'], item['url'])
+            by_host.setdefault(host(target), []).append(item)
+
+    lock    = threading.Lock()
+    stop    = threading.Event()
+    done    = 0
+    unsaved = 0      # results logged since the last JSON checkpoint
+    log     = None
+
+    def _record(item: dict, entry: dict, outcome: str) -> None:
+        nonlocal downloaded, done, unsaved
+        with lock:
+            done += 1
+            slot   = refresh.get(entry['key'])
+            status = ('unchanged' if slot is not None and entry is results[slot]
+                      else entry['status'])
+            counts[status] = counts.get(status, 0) + 1
+            if entry['pdf_path'] and status != 'unchanged':
+                downloaded += 1
+
+            print(f"[{done:3d}/{len(candidates)}] {entry['title']}")
+            print(f"          {item['url'][:80]}")
+            print(f"          {outcome}")
+            print()
 
-        print()
-        time.sleep(args.delay)
+            if slot is not None:
+                results[slot] = entry
+            else:
+                results.append(entry)
+            done_keys.add(entry['key'])
+
+            # Log every result; rewrite the JSON periodically
+            _append_result(log, entry)
+            unsaved += 1
+            if unsaved >= SAVE_EVERY:
+                save_results(results, res_path)
+                log.truncate(0)
+                unsaved = 0
+
+            if args.limit and downloaded >= args.limit and not stop.is_set():
+                print(f"Reached download limit ({args.limit}), stopping.\n")
+                stop.set()
+
+    def _host_worker(items: list) -> None:
+        session  = make_session()
+        interval = args.delay    # this host's current delay (AIMD back-off)
+        clean    = 0
+        for i, item in enumerate(items):
+            if i and stop.wait(interval):
+                return
+            if stop.is_set():
+                return
+            slot = refresh.get(item['key'])
+            entry, outcome, throttled = download_item(
+                item, session, out_dir, resolved.get(item['url']),
+                results[slot] if slot is not None else None)
+            if throttled:
+                interval = min(max(interval, 1.0) * 2, MAX_HOST_DELAY)
+                clean    = 0
+                outcome += f"  (host throttling — delay now {interval:.0f}s)"
+            else:
+                clean += 1
+                if clean >= RECOVER_AFTER and interval > args.delay:
+                    interval = max(args.delay, interval / 2)
+                    clean    = 0
+            _record(item, entry, outcome)
+
+    if by_host:
+        workers = max(1, min(args.workers, len(by_host)))
+        res_path.parent.mkdir(parents=True, exist_ok=True)
+        log = open(log_path, 'ab')
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as ex:
+                futures = [ex.submit(_host_worker, items) for items in by_host.values()]
+                try:
+                    for future in futures:
+                        future.result()
+                except BaseException:
+                    stop.set()
+                    raise
+        finally:
+            # Final consolidated JSON; the log is only needed until then
+            with lock:
+                if unsaved:
+                    save_results(results, res_path)
+                log.close()
+                log_path.unlink(missing_ok=True)
 
     # Summary
     print("=" * 60)
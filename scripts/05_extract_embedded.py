@@ -7,15 +7,18 @@ Each worker loads ML models once, then processes documents from a shared queue 
 no per-document model-reload overhead.  OCR is enabled but Docling's auto_ocr
 model detects embedded-font pages and largely skips it; PIL's decompression-bomb
 limit is raised so high-DPI images don't crash the OCR stage on the few pages
-that do trigger it.  Completed saves are overlapped with extraction via a background
-thread pool so the main loop is never blocked on disk I/O.
+that do trigger it.  Each worker writes its own outputs and reports back only a
+small summary, so multi-MB extraction results never cross the process boundary.
 
 Outputs per document (under --texts-dir/{key}/):
   docling.md          full markdown text
   page_texts.json     {page_no: text} dict (1-based keys)
   meta.json           title, authors, year, page_count, text_quality, …
 
-Results log: data/extract_results.json  (resume-safe, atomic writes)
+Results log: data/extract_results.json  (resume-safe, atomic writes); each
+result is appended to data/extract_results.jsonl as it completes, the JSON is
+rewritten every SAVE_EVERY docs and at the end, and a log left by an
+interrupted run is merged on the next start.
 
 Usage:
     python scripts/05_extract_embedded.py
@@ -24,14 +27,14 @@ Usage:
 """
 import sys
 import gc
+import heapq
 import os
+import re
 import json
 import time
 import atexit
 import multiprocessing as mp
 import queue as _queue
-import threading
-from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import argparse
 
@@ -45,6 +48,10 @@ load_dotenv(_ROOT / '.env')
 
 # ── Quality diagnostics ───────────────────────────────────────────────────────
 
+# Runs of Private Use Area codepoints — counted by the regex engine in C
+# rather than a per-character Python loop over multi-MB documents
+_PUA_RE = re.compile('[\ue000-\uf8ff]+')
+
 def compute_text_quality(full_text: str, page_texts: dict) -> dict:
     """
     Analyse extracted text for signs of garbled encoding.
@@ -76,7 +83,7 @@ def compute_text_quality(full_text: str, page_texts: dict) -> dict:
 
     n = len(full_text) or 1
     # Private Use Area: custom font glyphs that didn't map to Unicode
-    pua_count  = sum(1 for c in full_text if '\ue000' <= c <= '\uf8ff')
+    pua_count  = 0 if full_text.isascii() else sum(map(len, _PUA_RE.findall(full_text)))
     repl_count = full_text.count('\ufffd')
     pua_ratio  = pua_count  / n
     repl_ratio = repl_count / n
@@ -101,16 +108,25 @@ def compute_text_quality(full_text: str, page_texts: dict) -> dict:
 
 # ── Worker (module-level → picklable under spawn) ─────────────────────────────
 
-def _docling_worker(worker_id: int, task_q: mp.Queue, result_q: mp.Queue):
+def _docling_worker(worker_id: int, task_q: mp.Queue, result_q: mp.Queue,
+                    texts_dir_str: str, save_state):
     """
     Persistent Docling worker — OCR disabled (embedded fonts only).
 
-    Pulls (doc_id, key, pdf_path_str) from task_q.
+    Pulls (doc_id, key, pdf_path_str, meta) from task_q and writes the outputs
+    under texts_dir itself (see save_document).
+
+    save_state[worker_id] is the save hand-off with the main process: before
+    saving, the worker claims the doc (doc_id + 1) unless the main process
+    has already timed it out (-(doc_id + 1)), in which case nothing is written.
     Pushes:
       ('ready',    worker_id, None,   None, None)      on init success
       ('init_err', worker_id, None,   None, err_str)   on init failure
       ('started',  worker_id, doc_id, key,  None)      when extraction begins
-      ('ok',       worker_id, doc_id, key,  result)    on success
+      ('ok',       worker_id, doc_id, key,  summary)   on success — chars, pages
+                                                       + save_document's paths
+      ('save_err', worker_id, doc_id, key,  err_str)   extracted but not saved
+                                                       (also when timed out)
       ('err',      worker_id, doc_id, key,  err_str)   on failure
     """
     sys.path.insert(0, _SRC)
@@ -137,32 +153,52 @@ def _docling_worker(worker_id: int, task_q: mp.Queue, result_q: mp.Queue):
         result_q.put(('init_err', worker_id, None, None, str(e)))
         return
 
+    texts_dir = Path(texts_dir_str)
     while True:
         msg = task_q.get()
         if msg is None:
             break
-        doc_id, key, pdf_path_str = msg
+        doc_id, key, pdf_path_str, meta = msg
         result_q.put(('started', worker_id, doc_id, key, None))
+        result = None
         try:
             result = ext.extract(Path(pdf_path_str))
-            result_q.put(('ok', worker_id, doc_id, key, result))
-            del result          # release large extraction result before next doc
         except Exception as e:
             result_q.put(('err', worker_id, doc_id, key, str(e)))
-        finally:
-            gc.collect()        # reclaim memory now, before loading next document
+        if result is not None:
+            with save_state.get_lock():
+                cancelled = save_state[worker_id] == -(doc_id + 1)
+                if not cancelled:
+                    save_state[worker_id] = doc_id + 1
+            if cancelled:
+                result_q.put(('save_err', worker_id, doc_id, key, 'timed out — not saved'))
+                result = None
+        if result is not None:
+            try:
+                paths = save_document(key, result, meta, texts_dir)
+                result_q.put(('ok', worker_id, doc_id, key, {
+                    'chars': len(result.get('text') or ''),
+                    'pages': len(result.get('page_texts') or {}),
+                    **paths,
+                }))
+            except Exception as e:
+                result_q.put(('save_err', worker_id, doc_id, key, str(e)))
+        del result              # release large extraction result before next doc
+        gc.collect()            # reclaim memory now, before loading next document
 
 
 # ── Save helpers ──────────────────────────────────────────────────────────────
 
-_save_lock = threading.Lock()   # guards result-log writes across save threads
+# Rewrite extract_results.json after this many results; in between, each
+# result is only appended to the .jsonl log
+SAVE_EVERY = 50
 
 
 def save_document(key: str, result: dict, meta: dict, texts_dir: Path) -> dict:
     """
     Write markdown, page_texts JSON, and meta JSON (with quality diagnostics).
     Returns a dict of the paths written, suitable for the results log.
-    Thread-safe (each key gets its own directory; log writes are locked).
+    Safe to run in several workers at once (each key gets its own directory).
     """
     doc_dir = texts_dir / key
     doc_dir.mkdir(parents=True, exist_ok=True)
@@ -224,6 +260,32 @@ def save_log(results: list, path: Path):
     tmp.replace(path)
 
 
+def _append_result(log, entry: dict):
+    """Append one result to the JSONL log — O(1) per document."""
+    log.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    log.flush()
+
+
+def _replay_results_log(results: list, log_path: Path) -> int:
+    """
+    Append results left in the log by an interrupted run to ``results``.
+    Returns the number replayed.
+    """
+    try:
+        f = open(log_path, encoding='utf-8')
+    except FileNotFoundError:
+        return 0
+    replayed = 0
+    with f:
+        for line in f:
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue     # torn final line from a crash
+            replayed += 1
+    return replayed
+
+
 # ── Main ──────────────────────────────────────────────────────────────────────
 
 def main():
@@ -299,13 +361,18 @@ def main():
     ]
     print(f"Embedded-font PDFs available: {len(candidates)}")
 
-    # Resume: skip already-extracted docs
+    # Resume: skip already-extracted docs (+ any log left by an interrupted run)
+    log_path = res_path.with_suffix('.jsonl')
     if res_path.exists():
         prior = json.loads(res_path.read_text(encoding='utf-8'))
-        done  = {r['key'] for r in prior if r.get('status') == 'ok'}
-        print(f"Already extracted: {len(done)}  →  resuming")
     else:
-        prior, done = [], set()
+        prior = []
+    if _replay_results_log(prior, log_path):
+        save_log(prior, res_path)
+        log_path.unlink()
+    done = {r['key'] for r in prior if r.get('status') == 'ok'}
+    if prior:
+        print(f"Already extracted: {len(done)}  →  resuming")
 
     if not args.force:
         candidates = [r for r in candidates if r['key'] not in done]
@@ -331,6 +398,30 @@ def main():
              f"Workers: {args.workers}  |  Timeout: {args.timeout}s/doc"))
     print("=" * 60)
 
+    # Each result is appended to the log; the JSON is rewritten periodically
+    # and once more at the end
+    res_path.parent.mkdir(parents=True, exist_ok=True)
+    log     = open(log_path, 'a', encoding='utf-8')
+    results = list(prior)
+    unsaved = 0     # results logged since the last JSON checkpoint
+
+    def _record(entry: dict):
+        """Append ``entry`` to results and the log."""
+        nonlocal unsaved
+        results.append(entry)
+        _append_result(log, entry)
+        unsaved += 1
+        if unsaved >= SAVE_EVERY:
+            save_log(results, res_path)
+            log.truncate(0)
+            unsaved = 0
+
+    def _finish_log():
+        if unsaved:
+            save_log(results, res_path)
+        log.close()
+        log_path.unlink(missing_ok=True)
+
     # ── DIRECT MODE: single-process extraction (bypasses broken subprocess) ────
     if args.direct:
         try:
@@ -346,8 +437,7 @@ def main():
         ext = DoclingExtractor(do_ocr=True)
         print(f"Models ready in {int(time.time()-t0)}s\n")
 
-        results = list(prior)
-        total   = len(candidates)
+        total = len(candidates)
 
         for idx, item in enumerate(candidates, 1):
             key   = item['key']
@@ -391,9 +481,9 @@ def main():
                     'error':  str(exc)[:200],
                 }
 
-            results.append(entry)
-            save_log(results, res_path)
+            _record(entry)
             gc.collect()
+        _finish_log()
 
         # Summary
         ok_results = [r for r in results if r.get('status') == 'ok']
@@ -419,6 +509,8 @@ def main():
 
     n_workers = min(args.workers, len(candidates))
     task_q    = mp.Queue()
+    # Per-worker save claim / timeout mark — see _docling_worker
+    save_state = mp.Array('i', n_workers)
     result_q  = mp.Queue()
 
     # Staggered startup: spawn one worker at a time and wait for its 'ready'
@@ -431,7 +523,9 @@ def main():
     t0 = time.time()
 
     for wid in range(n_workers):
-        p = mp.Process(target=_docling_worker, args=(wid, task_q, result_q), daemon=True)
+        p = mp.Process(target=_docling_worker,
+                       args=(wid, task_q, result_q, str(texts_dir), save_state),
+                       daemon=True)
         p.start()
         workers.append(p)
         try:
@@ -442,38 +536,56 @@ def main():
                 print(f"  Worker {w_id} FAILED to init — exiting")
                 for _ in workers:
                     task_q.put(None)
+                _finish_log()
                 return
         except _queue.Empty:
             print(f"  ERROR: Worker {wid} did not start within 240s — exiting")
             for _ in workers:
                 task_q.put(None)
+            _finish_log()
             return
 
     print()
 
-    # Enqueue all tasks
+    # Enqueue all tasks (with the meta.json fields the worker saves)
     for doc_id, item in enumerate(candidates):
-        task_q.put((doc_id, item['key'], item['pdf_path']))
+        meta = {
+            'key':     item['key'],
+            'title':   item.get('title', ''),
+            'authors': item.get('authors', ''),
+            'year':    item.get('year',    ''),
+        }
+        task_q.put((doc_id, item['key'], item['pdf_path'], meta))
     for _ in range(n_workers):      # sentinel per worker
         task_q.put(None)
 
-    # ── Collect results, saving in background threads ─────────────────────────
-    results     = list(prior)
+    # ── Collect results (workers have already saved the outputs) ──────────────
     completed   = 0
     total       = len(candidates)
     key_to_item = {item['key']: item for item in candidates}
     start_times: dict[str, float] = {}   # populated on 'started', not at enqueue
+    running: dict[str, tuple[int, int]] = {}  # key → (worker id, doc_id)
+    deadlines: list[tuple[float, str]] = []   # min-heap of (timeout at, key)
+    timed_out: set[str] = set()
 
     print(f"Processing {total} documents…\n")
 
-    # I/O thread pool: disk writes don't stall the result-collection loop
-    save_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='save')
-
     while completed < total:
         # ── Timeout check (only started docs) ─────────────────────────────────
         now = time.time()
-        for key, t_start in list(start_times.items()):
-            if now - t_start > args.timeout:
+        while deadlines and deadlines[0][0] < now:
+            _, key = heapq.heappop(deadlines)
+            if key in start_times:      # else it finished before its deadline
+                # Mark it timed out so the worker won't save it — unless the
+                # worker is already writing its outputs, then let it finish
+                w, d = running[key]
+                with save_state.get_lock():
+                    saving = save_state[w] == d + 1
+                    if not saving:
+                        save_state[w] = -(d + 1)
+                if saving:
+                    heapq.heappush(deadlines, (now + args.timeout, key))
+                    continue
                 item = key_to_item.get(key, {})
                 print(f"  ⚠  TIMEOUT ({args.timeout}s): {item.get('title','?')[:55]}")
                 entry = {
@@ -483,14 +595,14 @@ def main():
                     'error':  f'exceeded {args.timeout}s',
                 }
                 del start_times[key]
+                timed_out.add(key)
                 completed += 1
-                with _save_lock:
-                    results.append(entry)
-                    save_log(results, res_path)
+                _record(entry)
 
-        # ── Drain result queue ─────────────────────────────────────────────────
+        # ── Drain result queue (wake no later than the next deadline) ──────────
+        wait = min(0.5, deadlines[0][0] - now) if deadlines else 0.5
         try:
-            status, wid, doc_id, key, payload = result_q.get(timeout=0.5)
+            status, wid, doc_id, key, payload = result_q.get(timeout=max(wait, 0.01))
         except _queue.Empty:
             continue
 
@@ -502,6 +614,8 @@ def main():
 
         if status == 'started':
             start_times[key] = time.time()
+            running[key]     = (wid, doc_id)
+            heapq.heappush(deadlines, (start_times[key] + args.timeout, key))
             print(f"  ⟳  [{len(start_times):2d} active] {title[:55]}  (worker {wid})")
             continue
 
@@ -509,52 +623,30 @@ def main():
         start_times.pop(key, None)
 
         # Skip if already counted as timed-out
-        with _save_lock:
-            already = any(r['key'] == key for r in results)
-        if already:
+        if key in timed_out:
             continue
 
         if status == 'ok':
-            chars = len(payload.get('text') or '')
-            pages = len(payload.get('page_texts') or {})
-
-            meta = {
-                'key':     key,
-                'title':   item.get('title', '') if isinstance(item, dict) else '',
-                'authors': item.get('authors', '') if isinstance(item, dict) else '',
-                'year':    item.get('year',    '') if isinstance(item, dict) else '',
+            tq   = payload.get('text_quality', '?')
+            icon = {'good': '✓', 'suspect': '⚠', 'garbled': '✗'}.get(tq, '?')
+            print(f"  ✓ [{completed+1:3d}/{total}] {title[:55]}")
+            print(f"      {payload['chars']:,} chars · {payload['pages']} pages · "
+                  f"quality: {icon} {tq}\n")
+            entry = {
+                'key':          key,
+                'title':        title,
+                'status':       'ok',
+                'chars':        payload['chars'],
+                'pages':        payload['pages'],
+                'text_quality': tq,
+                **{k: v for k, v in payload.items()
+                   if k not in ('chars', 'pages', 'text_quality')},
             }
 
-            # Kick off disk save in background; build result entry immediately
-            future = save_pool.submit(save_document, key, payload, meta, texts_dir)
-
-            def _on_save_done(fut, _key=key, _title=title, _chars=chars,
-                              _pages=pages, _completed=completed + 1, _total=total):
-                try:
-                    paths = fut.result()
-                    tq    = paths.get('text_quality', '?')
-                    quality_icon = {'good': '✓', 'suspect': '⚠', 'garbled': '✗'}.get(tq, '?')
-                    print(f"  ✓ [{_completed:3d}/{_total}] {_title[:55]}")
-                    print(f"      {_chars:,} chars · {_pages} pages · "
-                          f"quality: {quality_icon} {tq}\n")
-                    entry = {
-                        'key':          _key,
-                        'title':        _title,
-                        'status':       'ok',
-                        'chars':        _chars,
-                        'pages':        _pages,
-                        'text_quality': tq,
-                        **{k: v for k, v in paths.items() if k != 'text_quality'},
-                    }
-                except Exception as exc:
-                    print(f"  ⚠  Save failed for {_key}: {exc}\n")
-                    entry = {'key': _key, 'title': _title,
-                             'status': 'save_error', 'error': str(exc)}
-                with _save_lock:
-                    results.append(entry)
-                    save_log(results, res_path)
-
-            future.add_done_callback(_on_save_done)
+        elif status == 'save_err':
+            print(f"  ⚠  Save failed for {key}: {payload}\n")
+            entry = {'key': key, 'title': title,
+                     'status': 'save_error', 'error': str(payload)}
 
         else:   # err
             print(f"  ✗ [{completed+1:3d}/{total}] {title[:55]}")
@@ -565,14 +657,11 @@ def main():
                 'status': 'error',
                 'error':  str(payload)[:200],
             }
-            with _save_lock:
-                results.append(entry)
-                save_log(results, res_path)
 
+        _record(entry)
         completed += 1
 
-    # Wait for any in-flight saves before shutting down
-    save_pool.shutdown(wait=True)
+    _finish_log()
 
     # Shut down workers
     for p in workers:
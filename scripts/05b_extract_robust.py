@@ -36,6 +36,7 @@ from __future__ import annotations
 import argparse
 import json
 import os
+import re
 import sys
 import tempfile
 import threading
@@ -183,6 +184,9 @@ def _append_result(results: list, entry: dict):
 
 # ── Text quality ───────────────────────────────────────────────────────────────
 
+_PUA_RE = re.compile("[\ue000-\uf8ff]+")   # Private Use Area runs (see script 05)
+
+
 def _compute_quality(page_texts: dict) -> dict:
     """Return quality metrics dict (same schema as script 05)."""
     if not page_texts:
@@ -193,7 +197,7 @@ def _compute_quality(page_texts: dict) -> dict:
     n_pages  = len(page_texts)
     n_chars  = len(all_text) or 1
 
-    pua_count  = sum(1 for c in all_text if "\ue000" <= c <= "\uf8ff")
+    pua_count  = 0 if all_text.isascii() else sum(map(len, _PUA_RE.findall(all_text)))
     repl_count = all_text.count("\ufffd")
     pua_ratio  = pua_count  / n_chars
     repl_ratio = repl_count / n_chars
@@ -26,7 +26,6 @@ import argparse
 import importlib.util
 import subprocess
 from pathlib import Path
-from urllib.parse import urlparse
 
 _ROOT = Path(__file__).parent.parent
 sys.path.insert(0, str(_ROOT / 'src'))
@@ -57,7 +56,6 @@ _spec.loader.exec_module(_dl)
 
 make_session  = _dl.make_session
 try_download  = _dl.try_download
-safe_filename = _dl.safe_filename
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
@@ -175,25 +173,15 @@ def download_item(key: str, url: str, title: str,
                   session: requests.Session,
                   pdfs_dir: Path = PDFS_DIR) -> dict:
     """Download a PDF. Returns result dict."""
-    result = try_download(url, session)
+    result = try_download(url, session, pdfs_dir, key, title)
     status = result['status']
-    if status != 'ok' or not result.get('content'):
+    if status != 'ok' or not result.get('pdf_path'):
         reason = f"{status}"
         if result.get('error'):
             reason += f": {result['error']}"
         return {'success': False, 'failure_reason': reason[:120]}
 
-    raw_name = Path(urlparse(result['download_url']).path).name
-    fname    = safe_filename(raw_name)
-    if not fname.lower().endswith('.pdf'):
-        fname = safe_filename(title) + '.pdf'
-    if not fname.endswith('.pdf'):
-        fname += '.pdf'
-
-    dest = pdfs_dir / key / fname
-    dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_bytes(result['content'])
-
+    dest  = Path(result['pdf_path'])
     pages = count_pages(dest)
     return {
         'success':  True,
@@ -36,7 +36,7 @@ except ImportError:
 
 from pdf_finder import (
     PAYWALL_DOMAINS, HTML_DOMAINS,
-    make_session, host, resolve_archive_org,
+    make_session, host, looks_like_pdf_url, resolve_archive_org,
 )
 
 # ── Paths ─────────────────────────────────────────────────────────────────────
@@ -180,7 +180,7 @@ def check_url_accessible(url: str, session: requests.Session) -> tuple[bool, str
         ct = resp.headers.get('Content-Type', '')
         if 'application/pdf' in ct:
             return True, final_url
-        if final_url.lower().endswith('.pdf') or '/pdf' in final_url.lower():
+        if looks_like_pdf_url(final_url):
             # URL looks like a PDF but HEAD didn't confirm the content-type.
             # Some servers omit Content-Type on HEAD (legitimate), but paywall
             # landing pages also return 200 HTML at .pdf URLs (false positive).
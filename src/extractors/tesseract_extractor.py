@@ -1,8 +1,9 @@
 """
 Tesseract OCR extraction with auto-detected language support (Witness B).
 """
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import logging
 
 try:
@@ -27,20 +28,24 @@ class TesseractExtractor:
     # Default fallback when no language is provided or detected
     DEFAULT_LANG = 'eng'
 
-    def __init__(self, lang: Optional[str] = None):
+    def __init__(self, lang: Optional[str] = None, workers: int = 1):
         """
         Initialize Tesseract extractor.
 
         Args:
-            lang: Tesseract language string (e.g. 'eng+ara+fra').
-                  When None, the default 'eng' is used as a fallback;
-                  callers should supply the result of language_detector.detect_and_format()
-                  for best results.
+            lang:    Tesseract language string (e.g. 'eng+ara+fra').
+                     When None, the default 'eng' is used as a fallback;
+                     callers should supply the result of language_detector.detect_and_format()
+                     for best results.
+            workers: Pages OCR'd concurrently.  Each page runs in its own
+                     tesseract subprocess, so threads are enough to use
+                     several cores.
         """
         if not TESSERACT_AVAILABLE:
             raise ImportError("Tesseract not available")
 
         self.default_lang = lang or self.DEFAULT_LANG
+        self.workers      = max(1, workers)
 
         # Verify Tesseract binary is reachable
         try:
@@ -49,6 +54,29 @@ class TesseractExtractor:
         except Exception as e:
             logging.warning(f"Could not query Tesseract languages: {e}")
 
+    def _ocr_page(self, img, lang: str) -> Tuple[str, float]:
+        """OCR one page image; returns (text, mean word confidence 0-100)."""
+        text = pytesseract.image_to_string(
+            img,
+            lang=lang,
+            config='--psm 3',   # fully automatic page segmentation
+        )
+
+        conf = None
+        try:
+            data = pytesseract.image_to_data(
+                img,
+                lang=lang,
+                output_type=pytesseract.Output.DICT,
+            )
+            confs = [c for c in data['conf'] if c != -1]
+            if confs:
+                conf = sum(confs) / len(confs)
+        except Exception as e:
+            logging.warning(f"Could not get Tesseract confidence: {e}")
+            conf = 50.0
+        return text, conf
+
     def extract(self, file_path: Path, lang: Optional[str] = None) -> Dict:
         """
         Extract text using Tesseract OCR.
@@ -74,33 +102,20 @@ class TesseractExtractor:
         try:
             # Convert PDF to images or load image directly
             if file_path.suffix.lower() == '.pdf':
-                images = convert_from_path(str(file_path), dpi=300, poppler_path='/usr/local/bin')
+                images = convert_from_path(str(file_path), dpi=300, poppler_path='/usr/local/bin',
+                                           thread_count=self.workers)
             else:
                 images = [Image.open(file_path)]
 
-            texts       = []
-            confidences = []
-
-            for img in images:
-                text = pytesseract.image_to_string(
-                    img,
-                    lang=active_lang,
-                    config='--psm 3',   # fully automatic page segmentation
-                )
-                texts.append(text)
-
-                try:
-                    data = pytesseract.image_to_data(
-                        img,
-                        lang=active_lang,
-                        output_type=pytesseract.Output.DICT,
-                    )
-                    confs = [c for c in data['conf'] if c != -1]
-                    if confs:
-                        confidences.append(sum(confs) / len(confs))
-                except Exception as e:
-                    logging.warning(f"Could not get Tesseract confidence: {e}")
-                    confidences.append(50.0)
+            # Pages are independent; map() keeps them in page order
+            if self.workers > 1 and len(images) > 1:
+                with ThreadPoolExecutor(max_workers=self.workers) as ex:
+                    pages = list(ex.map(lambda img: self._ocr_page(img, active_lang), images))
+            else:
+                pages = [self._ocr_page(img, active_lang) for img in images]
+
+            texts       = [text for text, _ in pages]
+            confidences = [conf for _, conf in pages if conf is not None]
 
             full_text = '\n\n'.join(texts)
             avg_conf  = (sum(confidences) / len(confidences)) if confidences else 0.0
@@ -0,0 +1,45 @@
+"""
+JSON encode/decode helpers shared by the pipeline scripts.
+
+Uses orjson when it is installed (several times faster on large inventories
+and results logs) and falls back to the stdlib json module otherwise.  Both
+paths write equivalent JSON with a two-space indent, but the bytes can
+differ: orjson formats some floats differently (1e20 vs 1e+20, 1e-7 vs
+1e-07).  Only the stdlib path matches json.dumps(indent=2) exactly.
+"""
+import json
+from pathlib import Path
+
+try:
+    import orjson
+except ImportError:  # orjson optional — stdlib fallback
+    orjson = None
+
+
+def loads(data: bytes | str):
+    """Parse a JSON document from bytes or str."""
+    return orjson.loads(data) if orjson else json.loads(data)
+
+
+def dumps(obj, indent: bool = True) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON — indented by two spaces, or on one line."""
+    if orjson:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    return json.dumps(obj, indent=2 if indent else None,
+                      ensure_ascii=False).encode('utf-8')
+
+
+def write_json_list(items: list, path: Path) -> None:
+    """
+    Stream a list to ``path`` one element at a time.
+
+    Two-space-indented like dumps() (so the same float caveat applies with
+    orjson), without ever holding the whole encoded document in memory.
+    """
+    with open(path, 'wb') as f:
+        f.write(b'[')
+        for i, item in enumerate(items):
+            f.write(b',\n  ' if i else b'\n  ')
+            f.write(dumps(item).replace(b'\n', b'\n  '))
+        f.write(b'\n]' if items else b']')
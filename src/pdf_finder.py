@@ -4,6 +4,7 @@ Shared PDF URL resolution helpers.
 Used by scripts/04_download_pdfs.py and scripts/import_scan.py.
 Extracted into src/ so both scripts can import without code duplication.
 """
+import functools
 import re
 import requests
 from pathlib import Path
@@ -38,6 +39,25 @@ HTML_DOMAINS = {
     'myoldmaps.com',       # handled separately — direct PDF links
 }
 
+
+def _build_domain_trie() -> dict:
+    """
+    Reverse-label trie over PAYWALL_DOMAINS and HTML_DOMAINS, e.g.
+    {'org': {'jstor': {'#': 'paywall'}, ...}, ...}.  '#' marks the end of a
+    listed domain; paywall wins if a domain were ever in both sets.
+    """
+    trie: dict = {}
+    for tag, domains in (('html', HTML_DOMAINS), ('paywall', PAYWALL_DOMAINS)):
+        for domain in domains:
+            node = trie
+            for label in reversed(domain.split('.')):
+                node = node.setdefault(label, {})
+            node['#'] = tag
+    return trie
+
+
+_DOMAIN_TRIE = _build_domain_trie()
+
 ARCHIVE_API  = 'https://archive.org/metadata/{identifier}'
 DOI_RESOLVER = 'https://doi.org/{doi}'
 
@@ -68,18 +88,51 @@ def is_pdf_response(resp: requests.Response) -> bool:
     return 'application/pdf' in ct or 'application/octet-stream' in ct
 
 
+def looks_like_pdf_url(url: str) -> bool:
+    """URL heuristic for when headers don't confirm a PDF (.pdf or a /pdf path)."""
+    u = url.lower()
+    return u.endswith('.pdf') or '/pdf' in u
+
+
 def save_pdf(content: bytes, dest: Path) -> None:
+    """Write via a .part file so an interrupted save never leaves a truncated PDF."""
     dest.parent.mkdir(parents=True, exist_ok=True)
-    dest.write_bytes(content)
+    part = dest.with_name(dest.name + '.part')
+    part.write_bytes(content)
+    part.replace(dest)
 
 
+@functools.lru_cache(maxsize=8192)
 def host(url: str) -> str:
     return urlparse(url).netloc.replace('www.', '')
 
 
+def classify_host(h: str) -> str | None:
+    """
+    'paywall' or 'html' if `h` is, or is a subdomain of, a listed domain;
+    else None.  Walks the host's labels right-to-left — O(len(host))
+    however many domains are listed.
+    """
+    node = _DOMAIN_TRIE
+    for label in reversed(h.split('.')):
+        node = node.get(label)
+        if node is None:
+            return None
+        if '#' in node:
+            return node['#']
+    return None
+
+
+def is_paywall_host(h: str) -> bool:
+    return classify_host(h) == 'paywall'
+
+
+def is_html_host(h: str) -> bool:
+    return classify_host(h) == 'html'
+
+
 def is_paywall_url(url: str) -> bool:
-    h = host(url)
-    return any(h == d or h.endswith('.' + d) for d in PAYWALL_DOMAINS)
+    return is_paywall_host(host(url))
 
 
 # ── Archive.org handler ────────────────────────────────────────────────────────
@@ -167,7 +220,7 @@ def check_url_accessible(url: str, session: requests.Session) -> dict:
         return {'status': 'open_access', 'resolved_url': final_url}
 
     # Some servers don't set Content-Type on HEAD — if URL looks like a PDF, accept it
-    if final_url.lower().endswith('.pdf') or '/pdf' in final_url.lower():
+    if looks_like_pdf_url(final_url):
         return {'status': 'open_access', 'resolved_url': final_url}
 
     return {'status': 'not_pdf', 'resolved_url': final_url}
@@ -2,7 +2,7 @@
 Quality assessment for multi-witness extraction.
 """
 from typing import Dict
-from .similarity import pairwise_similarities
+from .similarity import pairwise_similarities, witness_text
 from .corruption_detector import detect_corruption
 
 
@@ -27,14 +27,17 @@ def compute_quality_metrics(witnesses: Dict[str, Dict]) -> Dict:
             'corruption': {...}
         }
     """
+    # Each witness's comparison text, built once for both checks below
+    texts = {name: witness_text(result) for name, result in witnesses.items()}
+
     # Pairwise similarity between witnesses
-    similarity = pairwise_similarities(witnesses)
+    similarity = pairwise_similarities(witnesses, texts)
 
     # Check each witness for corruption
     corruption_results = {}
-    for name, result in witnesses.items():
-        if result.get('text'):
-            corruption_results[name] = detect_corruption(result['text'])
+    for name, text in texts.items():
+        if text:
+            corruption_results[name] = detect_corruption(text)
 
     # Best case corruption score (if ANY witness looks clean, we're OK)
     min_corruption = min(
@@ -5,7 +5,16 @@ Uses normalized Levenshtein distance to handle Arabic diacritics.
 import Levenshtein
 import unicodedata
 import re
-from typing import Dict
+from typing import Dict, List, Optional
+
+try:
+    # Levenshtein.ratio is the normalized Indel similarity; cpdist runs it
+    # over many pairs in C across threads
+    from rapidfuzz.distance import Indel
+    from rapidfuzz.process import cpdist
+    import numpy as np
+except ImportError:  # rapidfuzz < 3.6 or no numpy — fall back to a per-pair loop
+    cpdist = None
 
 # Markdown patterns to strip before comparison
 _MD_IMAGE    = re.compile(r'<!--.*?-->', re.DOTALL)   # <!-- image -->
@@ -61,6 +70,29 @@ def normalize_arabic_text(text: str) -> str:
     return text
 
 
+def _prepare(text: str) -> str:
+    """Strip Markdown formatting then normalize for diacritics."""
+    return normalize_arabic_text(strip_markdown(text))
+
+
+def _ratios(norm1: List[str], norm2: List[str]) -> List[float]:
+    """Element-wise Levenshtein ratio of already-normalized texts (0.0 if either is empty)."""
+    scores = [0.0] * len(norm1)
+    idx = [i for i, (a, b) in enumerate(zip(norm1, norm2)) if a and b]
+    if not idx:
+        return scores
+    a = [norm1[i] for i in idx]
+    b = [norm2[i] for i in idx]
+    if cpdist is not None:
+        batch = cpdist(a, b, scorer=Indel.normalized_similarity,
+                       dtype=np.float64, workers=-1)
+    else:
+        batch = [Levenshtein.ratio(x, y) for x, y in zip(a, b)]
+    for i, score in zip(idx, batch):
+        scores[i] = float(score)
+    return scores
+
+
 def compute_similarity(text1: str, text2: str) -> float:
     """
     Compute normalized similarity between two texts.
@@ -84,13 +116,48 @@ def compute_similarity(text1: str, text2: str) -> float:
     return Levenshtein.ratio(norm1, norm2)
 
 
-def pairwise_similarities(witnesses: Dict[str, Dict]) -> Dict:
+def compute_similarity_batch(texts1: List[str], texts2: List[str]) -> List[float]:
+    """
+    Element-wise compute_similarity over two equal-length lists of texts.
+
+    Scores every pair in a single batched call instead of one Python-level
+    call per pair.
+
+    Args:
+        texts1, texts2: Texts to compare, paired by position
+
+    Returns:
+        List of similarity scores 0.0-1.0, one per pair
+    """
+    return _ratios([_prepare(t) for t in texts1], [_prepare(t) for t in texts2])
+
+
+def witness_text(result: Dict) -> str:
+    """
+    Text a witness contributes to comparison.
+
+    A result may carry 'compare_pages' (keys into its 'page_texts') to limit
+    comparison to those pages instead of its full 'text' — e.g. only the
+    Docling pages that Vision also sampled.
+    """
+    pages = result.get('compare_pages')
+    if pages is None:
+        return result.get('text') or ''
+    page_texts = result.get('page_texts', {})
+    return ' '.join(page_texts[p] for p in pages)
+
+
+def pairwise_similarities(witnesses: Dict[str, Dict],
+                          texts: Optional[Dict[str, str]] = None) -> Dict:
     """
     Compute all pairwise similarities between witnesses.
 
     Args:
         witnesses: Dict of {method_name: extraction_result}
                   where extraction_result has 'text' key
+                  (or 'page_texts' + 'compare_pages', see witness_text)
+        texts: Optional {method_name: witness_text(result)} already built
+               by the caller, so the pages are not joined a second time
 
     Returns:
         {
@@ -105,11 +172,14 @@ def pairwise_similarities(witnesses: Dict[str, Dict]) -> Dict:
         }
     """
     # Extract texts from successful extractions
+    if texts is None:
+        texts = {name: witness_text(result) for name, result in witnesses.items()}
     texts = {
-        name: result.get('text', '')
+        name: texts[name]
         for name, result in witnesses.items()
-        if result.get('text') and result.get('error') is None
+        if result.get('error') is None
     }
+    texts = {name: text for name, text in texts.items() if text}
 
     if len(texts) < 2:
         return {
@@ -120,15 +190,12 @@ def pairwise_similarities(witnesses: Dict[str, Dict]) -> Dict:
             'witness_count': len(texts)
         }
 
-    # Compute all pairs
-    pairs = {}
+    # Compute all pairs — normalize each witness once, score in one batch
     methods = list(texts.keys())
-
-    for i, method1 in enumerate(methods):
-        for method2 in methods[i+1:]:
-            key = f"{method1}_vs_{method2}"
-            similarity = compute_similarity(texts[method1], texts[method2])
-            pairs[key] = similarity
+    norm = {name: _prepare(text) for name, text in texts.items()}
+    combos = [(m1, m2) for i, m1 in enumerate(methods) for m2 in methods[i+1:]]
+    scores = _ratios([norm[m1] for m1, _ in combos], [norm[m2] for _, m2 in combos])
+    pairs = {f"{m1}_vs_{m2}": score for (m1, m2), score in zip(combos, scores)}
 
     # Statistics
     similarities = list(pairs.values())